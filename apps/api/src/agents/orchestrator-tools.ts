@@ -34,6 +34,10 @@ const DEFAULT_POSITION = { x: 250, y: 150 };
 const DEFAULT_SOURCE_HANDLE = 'geometry-out';
 const DEFAULT_TARGET_HANDLE = 'geometry-in';
 
+// Last catalog string seen and the node types parsed from it.
+let lastCatalog: string | undefined;
+let lastCatalogTypes = new Set<string>();
+
 /**
  * Resolve the EditorRoom stub for the current turn's project and assert the
  * turn carries a projectId.
@@ -66,8 +70,17 @@ async function resolveRoom(ctx: OrchestratorToolsCtx) {
  * legitimate edits just because the catalog wasn't provided/parseable.
  */
 function parseCatalogTypes(catalog: string | undefined): Set<string> {
+  if (!catalog) return new Set<string>();
+  // The client resends the same catalog every turn; only re-parse when it changes.
+  if (catalog !== lastCatalog) {
+    lastCatalogTypes = collectCatalogTypes(catalog);
+    lastCatalog = catalog;
+  }
+  return lastCatalogTypes;
+}
+
+function collectCatalogTypes(catalog: string): Set<string> {
   const types = new Set<string>();
-  if (!catalog) return types;
   let parsed: unknown;
   try {
     parsed = JSON.parse(catalog);
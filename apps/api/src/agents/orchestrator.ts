@@ -55,6 +55,15 @@ export class Orchestrator extends Think<Env> {
    */
   private turnContext: TurnContext = {};
 
+  /** Model handle, built on the first turn and reused for the life of the DO. */
+  private model: LanguageModel | undefined;
+
+  /**
+   * Tool set, built once per DO. Tools read the per-turn context through
+   * `getContext`, so the same instances serve every turn.
+   */
+  private tools: ToolSet | undefined;
+
   /**
    * Called by the agents SDK when a WebSocket client connects.
    *
@@ -101,12 +110,15 @@ export class Orchestrator extends Think<Env> {
   }
 
   getModel(): LanguageModel {
-    const provider = createOpenAICompatible({
-      name: 'openrouter',
-      apiKey: this.env.OPENROUTER_API_KEY,
-      baseURL: 'https://openrouter.ai/api/v1',
-    });
-    return provider('anthropic/claude-sonnet-4.6');
+    if (!this.model) {
+      const provider = createOpenAICompatible({
+        name: 'openrouter',
+        apiKey: this.env.OPENROUTER_API_KEY,
+        baseURL: 'https://openrouter.ai/api/v1',
+      });
+      this.model = provider('anthropic/claude-sonnet-4.6');
+    }
+    return this.model;
   }
 
   getSystemPrompt(): string {
@@ -147,10 +159,10 @@ export class Orchestrator extends Think<Env> {
   }
 
   getTools(): ToolSet {
-    return createOrchestratorTools({
+    return (this.tools ??= createOrchestratorTools({
       env: this.env,
       getContext: () => this.turnContext,
-    });
+    }));
   }
 
   /**
@@ -2,10 +2,13 @@ import type { MiddlewareHandler } from 'hono';
 import { createClerkClient } from '@clerk/backend';
 import type { Env } from './index';
 
+// The secret is fixed per deployment, so one client per isolate is enough.
+let clerk: ReturnType<typeof createClerkClient> | undefined;
+
 /** Verifies the Clerk session token from the Authorization: Bearer header. */
 export const requireAuth: MiddlewareHandler<{ Bindings: Env; Variables: { userId: string } }> =
   async (c, next) => {
-    const clerk = createClerkClient({
+    clerk ??= createClerkClient({
       secretKey: c.env.CLERK_SECRET_KEY,
       publishableKey: c.env.CLERK_PUBLISHABLE_KEY,
     });
@@ -18,6 +18,8 @@ export interface Env {
   CLERK_PUBLISHABLE_KEY: string;
   ALLOWED_ORIGIN: string;
   ROOM_TOKEN_SECRET: string;
+  /** "1" dumps the raw model response when generated node JSON is rejected. */
+  AI_DEBUG?: string;
   EditorRoom: DurableObjectNamespace<EditorRoom>;
   Orchestrator: DurableObjectNamespace<Orchestrator>;
   DB: D1Database;
@@ -34,7 +36,14 @@ app.get('/health', (c) => c.json({ ok: true, service: 'geometry-api' }));
 
 // Public, non-sensitive endpoints (registered BEFORE auth so they stay open):
 // the static model list and the node catalog, both potentially fetched pre-sign-in.
-app.get('/ai/models', (c) => c.json({ success: true, data: { models: getAvailableModels() } }));
+// Both bodies are fixed per deployment, so they are serialized once.
+const modelsBody = JSON.stringify({ success: true, data: { models: getAvailableModels() } });
+app.get('/ai/models', (c) =>
+  c.body(modelsBody, 200, {
+    'Content-Type': 'application/json; charset=UTF-8',
+    'Cache-Control': 'public, max-age=300',
+  }),
+);
 
 // Only AI generation requires auth (it costs money / uses user context).
 app.use('/ai/*', requireAuth);
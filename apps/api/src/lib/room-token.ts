@@ -34,15 +34,25 @@ function base64urlDecode(s: string): Uint8Array {
   return bytes;
 }
 
-async function importKey(secret: string): Promise<CryptoKey> {
-  const enc = new TextEncoder();
-  return crypto.subtle.importKey(
-    'raw',
-    enc.encode(secret),
-    { name: 'HMAC', hash: 'SHA-256' },
-    false,
-    ['sign', 'verify'],
-  );
+// Imported keys keyed by secret; the secret is fixed per deployment, so this
+// stays at one entry and lives for the isolate's lifetime.
+const keyCache = new Map<string, Promise<CryptoKey>>();
+
+function importKey(secret: string): Promise<CryptoKey> {
+  let key = keyCache.get(secret);
+  if (!key) {
+    key = crypto.subtle.importKey(
+      'raw',
+      new TextEncoder().encode(secret),
+      { name: 'HMAC', hash: 'SHA-256' },
+      false,
+      ['sign', 'verify'],
+    );
+    // Don't pin a rejected import; let the next call retry.
+    key.catch(() => keyCache.delete(secret));
+    keyCache.set(secret, key);
+  }
+  return key;
 }
 
 // ---------------------------------------------------------------------------
@@ -1,7 +1,9 @@
-import { Hono } from 'hono';
+import { Hono, type Context } from 'hono';
+import { stream } from 'hono/streaming';
 import {
   GeometryAIAgent, validateAPIRequest, validationToResponse,
-  createHTTPResponse, createError, ErrorType, logError, validateSceneJSON,
+  createHTTPResponse, createError, createErrorResponse, ErrorType, handleError, logError, validateSceneJSON,
+  JsonObjectScanner, parseJsonResponse, sseFrame, sseFrameWithJson, textFrame,
   type CreateNodeRequest, type GenerateSceneRequest,
   type ModifyNodeRequest, type ModifySceneRequest,
 } from '@geometry-script/agent-core';
@@ -15,21 +17,97 @@ const sseHeaders = {
   'Connection': 'keep-alive',
 };
 
-function agentFor(c: { env: Env }, catalog: string) {
-  return new GeometryAIAgent({ apiKey: c.env.OPENROUTER_API_KEY, catalog });
+// Fixed status frames, encoded once at module load rather than per request.
+const GENERATING_SCENE_FRAME = sseFrame({ type: 'progress', content: 'Generating scene...' });
+const PROCESSING_JSON_FRAME = sseFrame({ type: 'progress', content: 'Processing generated JSON...' });
+const DONE_FRAME = sseFrame({ type: 'done', content: '' });
+
+/**
+ * Coalesces streamed tokens into fewer SSE frames. Pending text is flushed once
+ * `maxChunks` tokens have queued or the oldest one has waited `maxDelayMs`
+ * (checked as tokens arrive), and on the final `flush()`. `push` and `flush`
+ * return the emit's promise when they flush, so callers can await it.
+ */
+function tokenBatcher(emit: (text: string) => Promise<void>, maxChunks = 16, maxDelayMs = 25) {
+  let pending = '';
+  let count = 0;
+  let since = 0;
+  const flush = (): Promise<void> | undefined => {
+    if (count === 0) return;
+    const text = pending;
+    pending = '';
+    count = 0;
+    return emit(text);
+  };
+  const push = (chunk: string): Promise<void> | undefined => {
+    // Providers send empty deltas (e.g. role or finish-only chunks); they carry
+    // nothing to show and should not count toward a flush
+    if (!chunk) return;
+    if (count === 0) since = Date.now();
+    pending += chunk;
+    count++;
+    if (count >= maxChunks || Date.now() - since >= maxDelayMs) return flush();
+  };
+  return { push, flush };
 }
 
-/** Extract a JSON scene object from a model response that may include markdown/prose. */
-function tryParseScene(text: string): any | null {
-  const cleaned = text.replace(/```json\s*/g, '').replace(/```\s*/g, '');
-  const start = cleaned.indexOf('{');
-  const end = cleaned.lastIndexOf('}');
-  if (start === -1 || end === -1 || end <= start) return null;
-  try {
-    return JSON.parse(cleaned.slice(start, end + 1));
-  } catch {
-    return null;
+// Upper bound on concurrent model streams per isolate. Each one holds an
+// upstream connection for as long as the model keeps streaming; past this,
+// shed load with a 503 instead of queueing more work behind the ones running.
+const MAX_IN_FLIGHT_STREAMS = 32;
+let inFlightStreams = 0;
+
+/**
+ * Open an SSE response backed by Hono's streaming helper. `run` emits frames
+ * through `send`; the stream closes once it settles. Both emitters resolve once
+ * the stream has taken the frame, so a loop that awaits them reads the model
+ * no faster than the client drains the response. `signal` aborts when the
+ * client disconnects, and once `run` settles; pass it to the model call so
+ * the provider request ends with the response instead of running on unread.
+ */
+function sseStream(
+  c: Context,
+  run: (
+    send: (obj: unknown) => Promise<void>,
+    write: (frame: Uint8Array) => Promise<void>,
+    signal: AbortSignal,
+  ) => Promise<void>,
+) {
+  if (inFlightStreams >= MAX_IN_FLIGHT_STREAMS) {
+    const error = createError(
+      ErrorType.AI_SERVICE_ERROR,
+      'Too many concurrent AI requests, please retry shortly',
+      { inFlight: inFlightStreams },
+      'sseStream',
+    );
+    const response = createHTTPResponse(createErrorResponse(error), 503);
+    response.headers.set('Retry-After', '2');
+    return response;
   }
+
+  inFlightStreams++;
+  for (const [name, value] of Object.entries(sseHeaders)) c.header(name, value);
+  return stream(c, async (s) => {
+    const done = new AbortController();
+    s.onAbort(() => done.abort());
+    const write = async (frame: Uint8Array) => {
+      await s.write(frame);
+    };
+    try {
+      await run((obj) => write(sseFrame(obj)), write, done.signal);
+    } finally {
+      done.abort();
+      inFlightStreams--;
+    }
+  });
+}
+
+function agentFor(c: { env: Env }, catalog: string) {
+  return new GeometryAIAgent({
+    apiKey: c.env.OPENROUTER_API_KEY,
+    catalog,
+    debug: c.env.AI_DEBUG === '1',
+  });
 }
 
 // POST /ai/generate-node
@@ -42,44 +120,45 @@ ai.post('/generate-node', async (c) => {
   const { prompt, model, mode = 'generate', catalog = '' } = body;
   const geometryAI = agentFor(c, catalog);
 
-  const stream = new ReadableStream({
-    async start(controller) {
-      const encoder = new TextEncoder();
-      const send = (obj: unknown) =>
-        controller.enqueue(encoder.encode(`data: ${JSON.stringify(obj)}\n\n`));
-      try {
-        const taskRequest: CreateNodeRequest = { task: 'create_node', behavior: prompt };
-        if (mode === 'generate') {
-          let fullResponse = '';
-          for await (const chunk of geometryAI.streamTask(taskRequest, model)) {
-            fullResponse += chunk;
-            send({ type: 'progress', content: chunk });
-          }
-          send({ type: 'progress', content: 'Processing generated JSON...' });
-          const nodeDefinition = geometryAI.parseJsonNodeDefinition(fullResponse);
-          if (nodeDefinition) {
-            send({ type: 'success', content: 'Node generated successfully!', node: nodeDefinition });
-          } else {
-            send({ type: 'error', content: 'Failed to parse generated JSON to valid node format', errorType: ErrorType.PARSING_ERROR });
-          }
-        } else if (mode === 'explain') {
-          for await (const chunk of geometryAI.streamTask(taskRequest, model)) {
-            send({ type: 'stream', content: chunk });
-          }
-          send({ type: 'done', content: '' });
+  return sseStream(c, async (send, write, signal) => {
+    try {
+      const taskRequest: CreateNodeRequest = { task: 'create_node', behavior: prompt };
+      if (mode === 'generate') {
+        let fullResponse = '';
+        const tokens = tokenBatcher((content) => write(textFrame('progress', content)));
+        for await (const chunk of geometryAI.streamTask(taskRequest, model, signal)) {
+          if (signal.aborted) return;
+          fullResponse += chunk;
+          await tokens.push(chunk);
+        }
+        await tokens.flush();
+        await write(PROCESSING_JSON_FRAME);
+        const nodeDefinition = geometryAI.parseJsonNodeDefinition(fullResponse);
+        if (nodeDefinition) {
+          await send({ type: 'success', content: 'Node generated successfully!', node: nodeDefinition });
         } else {
-          send({ type: 'error', content: `Invalid mode: ${mode}`, errorType: ErrorType.VALIDATION_ERROR });
+          await send({ type: 'error', content: 'Failed to parse generated JSON to valid node format', errorType: ErrorType.PARSING_ERROR });
+        }
+      } else if (mode === 'explain') {
+        const tokens = tokenBatcher((content) => write(textFrame('stream', content)));
+        for await (const chunk of geometryAI.streamTask(taskRequest, model, signal)) {
+          if (signal.aborted) return;
+          await tokens.push(chunk);
         }
-      } catch (error) {
-        const e = createError(ErrorType.AI_SERVICE_ERROR, 'Failed to generate node', error, 'generate-node');
-        logError(e);
-        send({ type: 'error', content: e.message, errorType: e.type });
-      } finally {
-        controller.close();
+        await tokens.flush();
+        await write(DONE_FRAME);
+      } else {
+        await send({ type: 'error', content: `Invalid mode: ${mode}`, errorType: ErrorType.VALIDATION_ERROR });
       }
-    },
+    } catch (error) {
+      // A disconnect aborts the model call, which surfaces here; nobody is listening
+      if (signal.aborted) return;
+      // streamTask throws StandardErrors; keep their type and message
+      const e = handleError(error, 'generate-node');
+      logError(e);
+      await send({ type: 'error', content: e.message, errorType: e.type });
+    }
   });
-  return new Response(stream, { headers: sseHeaders });
 });
 
 // POST /ai/generate-scene
@@ -92,46 +171,50 @@ ai.post('/generate-scene', async (c) => {
   const { prompt, model, mode = 'generate', catalog = '' } = body;
   const geometryAI = agentFor(c, catalog);
 
-  const stream = new ReadableStream({
-    async start(controller) {
-      const encoder = new TextEncoder();
-      const send = (obj: unknown) =>
-        controller.enqueue(encoder.encode(`data: ${JSON.stringify(obj)}\n\n`));
-      try {
-        const req: GenerateSceneRequest = { task: 'generate_scene', scene_description: prompt };
-        if (mode === 'generate') {
-          send({ type: 'progress', content: 'Generating scene...' });
-          // Stream once and accumulate — do NOT also call executeTask (that would invoke the LLM twice).
-          let sceneResult = '';
-          for await (const chunk of geometryAI.streamGenerateScene(req, model)) {
-            sceneResult += chunk;
-            send({ type: 'stream', content: chunk }); // live feedback, parity with original
-          }
-          const scene = tryParseScene(sceneResult);
-          const validationResult = scene ? validateSceneJSON(scene) : { success: false, errors: ['Not valid JSON'] };
-          if (scene && validationResult.success) {
-            send({ type: 'success', content: 'Scene generated successfully!', scene });
-          } else {
-            send({ type: 'error', content: `Scene validation failed: ${validationResult.errors.join(', ')}`, errorType: ErrorType.VALIDATION_ERROR });
-          }
-        } else if (mode === 'explain') {
-          for await (const chunk of geometryAI.streamGenerateScene(req, model)) {
-            send({ type: 'stream', content: chunk });
-          }
-          send({ type: 'done', content: '' });
+  return sseStream(c, async (send, write, signal) => {
+    try {
+      const req: GenerateSceneRequest = { task: 'generate_scene', scene_description: prompt };
+      if (mode === 'generate') {
+        await write(GENERATING_SCENE_FRAME);
+        // Stream once and accumulate — do NOT also call executeTask (that would invoke the LLM twice).
+        // Stop reading as soon as the scene object closes. The break alone leaves the
+        // provider request running; sseStream aborts it once this handler returns.
+        const scanner = new JsonObjectScanner();
+        const tokens = tokenBatcher((content) => write(textFrame('stream', content))); // live feedback
+        let sceneResult = '';
+        for await (const chunk of geometryAI.streamGenerateScene(req, model, signal)) {
+          if (signal.aborted) return;
+          sceneResult += chunk;
+          await tokens.push(chunk);
+          if (scanner.push(chunk)) break;
+        }
+        await tokens.flush();
+        const scene = parseJsonResponse(sceneResult);
+        const validationResult = scene ? validateSceneJSON(scene) : { success: false, errors: ['Not valid JSON'] };
+        if (scene && validationResult.success) {
+          await send({ type: 'success', content: 'Scene generated successfully!', scene });
         } else {
-          send({ type: 'error', content: `Invalid mode: ${mode}`, errorType: ErrorType.VALIDATION_ERROR });
+          await send({ type: 'error', content: `Scene validation failed: ${validationResult.errors.join(', ')}`, errorType: ErrorType.VALIDATION_ERROR });
+        }
+      } else if (mode === 'explain') {
+        const tokens = tokenBatcher((content) => write(textFrame('stream', content)));
+        for await (const chunk of geometryAI.streamGenerateScene(req, model, signal)) {
+          if (signal.aborted) return;
+          await tokens.push(chunk);
         }
-      } catch (error) {
-        const e = createError(ErrorType.AI_SERVICE_ERROR, 'Failed to generate scene', error, 'generate-scene');
-        logError(e);
-        send({ type: 'error', content: e.message, errorType: e.type });
-      } finally {
-        controller.close();
+        await tokens.flush();
+        await write(DONE_FRAME);
+      } else {
+        await send({ type: 'error', content: `Invalid mode: ${mode}`, errorType: ErrorType.VALIDATION_ERROR });
       }
-    },
+    } catch (error) {
+      if (signal.aborted) return;
+      // Keep the type of StandardErrors and timeouts instead of a generic service error
+      const e = handleError(error, 'generate-scene');
+      logError(e);
+      await send({ type: 'error', content: e.message, errorType: e.type });
+    }
   });
-  return new Response(stream, { headers: sseHeaders });
 });
 
 // POST /ai/modify-node
@@ -139,29 +222,21 @@ ai.post('/modify-node', async (c) => {
   const body = await c.req.json();
   const { nodeData, modification_description, model, catalog = '' } = body;
   const geometryAI = agentFor(c, catalog);
-  const stream = new ReadableStream({
-    async start(controller) {
-      const encoder = new TextEncoder();
-      const send = (obj: unknown) =>
-        controller.enqueue(encoder.encode(`data: ${JSON.stringify(obj)}\n\n`));
-      try {
-        const req: ModifyNodeRequest = { task: 'modify_node', nodeData, modification_description };
-        const result = await geometryAI.executeTask(req, model);
-        if (result.success && result.data) {
-          send({ type: 'success', content: 'Node modified successfully!', node: JSON.parse(result.data) });
-        } else {
-          send({ type: 'error', content: result.error?.message ?? 'Modify node failed', errorType: result.error?.type });
-        }
-      } catch (error) {
-        const e = createError(ErrorType.AI_SERVICE_ERROR, 'Failed to modify node', error, 'modify-node');
-        logError(e);
-        send({ type: 'error', content: e.message, errorType: e.type });
-      } finally {
-        controller.close();
+  return sseStream(c, async (send, write) => {
+    try {
+      const req: ModifyNodeRequest = { task: 'modify_node', nodeData, modification_description };
+      const result = await geometryAI.executeTask(req, model);
+      if (result.success && result.data) {
+        await write(sseFrameWithJson({ type: 'success', content: 'Node modified successfully!' }, 'node', result.data));
+      } else {
+        await send({ type: 'error', content: result.error?.message ?? 'Modify node failed', errorType: result.error?.type });
       }
-    },
+    } catch (error) {
+      const e = createError(ErrorType.AI_SERVICE_ERROR, 'Failed to modify node', error, 'modify-node');
+      logError(e);
+      await send({ type: 'error', content: e.message, errorType: e.type });
+    }
   });
-  return new Response(stream, { headers: sseHeaders });
 });
 
 // POST /ai/modify-scene
@@ -169,27 +244,19 @@ ai.post('/modify-scene', async (c) => {
   const body = await c.req.json();
   const { sceneData, modification_description, model, catalog = '' } = body;
   const geometryAI = agentFor(c, catalog);
-  const stream = new ReadableStream({
-    async start(controller) {
-      const encoder = new TextEncoder();
-      const send = (obj: unknown) =>
-        controller.enqueue(encoder.encode(`data: ${JSON.stringify(obj)}\n\n`));
-      try {
-        const req: ModifySceneRequest = { task: 'modify_scene', sceneData, modification_description };
-        const result = await geometryAI.executeTask(req, model);
-        if (result.success && result.data) {
-          send({ type: 'success', content: 'Scene modified successfully!', scene: JSON.parse(result.data) });
-        } else {
-          send({ type: 'error', content: result.error?.message ?? 'Modify scene failed', errorType: result.error?.type });
-        }
-      } catch (error) {
-        const e = createError(ErrorType.AI_SERVICE_ERROR, 'Failed to modify scene', error, 'modify-scene');
-        logError(e);
-        send({ type: 'error', content: e.message, errorType: e.type });
-      } finally {
-        controller.close();
+  return sseStream(c, async (send, write) => {
+    try {
+      const req: ModifySceneRequest = { task: 'modify_scene', sceneData, modification_description };
+      const result = await geometryAI.executeTask(req, model);
+      if (result.success && result.data) {
+        await write(sseFrameWithJson({ type: 'success', content: 'Scene modified successfully!' }, 'scene', result.data));
+      } else {
+        await send({ type: 'error', content: result.error?.message ?? 'Modify scene failed', errorType: result.error?.type });
       }
-    },
+    } catch (error) {
+      const e = createError(ErrorType.AI_SERVICE_ERROR, 'Failed to modify scene', error, 'modify-scene');
+      logError(e);
+      await send({ type: 'error', content: e.message, errorType: e.type });
+    }
   });
-  return new Response(stream, { headers: sseHeaders });
 });
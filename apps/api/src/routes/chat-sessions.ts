@@ -41,13 +41,15 @@ chatSessions.post('/:projectId/sessions', async (c) => {
   const projectId = c.req.param('projectId');
   const db = drizzle(c.env.DB);
 
-  // Verify caller owns the project
-  const project = await getOwnedProject(db, projectId, userId);
+  // Verify caller owns the project while the body is being read
+  const [project, body] = await Promise.all([
+    getOwnedProject(db, projectId, userId),
+    c.req.json<{ title?: string }>().catch((): { title?: string } => ({})),
+  ]);
   if (!project) {
     return c.json({ success: false, error: { message: 'Not found' } }, 404);
   }
 
-  const body: { title?: string } = await c.req.json<{ title?: string }>().catch(() => ({}));
   const now = Date.now();
   const row = {
     id: crypto.randomUUID(),
@@ -4,4 +4,12 @@ import { SERVER_NODE_DEFINITIONS } from '../data/serverNodes';
 
 export const nodes = new Hono<{ Bindings: Env; Variables: { userId: string } }>();
 
-nodes.get('/', (c) => c.json({ success: true, data: SERVER_NODE_DEFINITIONS }));
+// The catalog is static per deployment: serialize it once, not per request.
+const catalogBody = JSON.stringify({ success: true, data: SERVER_NODE_DEFINITIONS });
+
+nodes.get('/', (c) =>
+  c.body(catalogBody, 200, {
+    'Content-Type': 'application/json; charset=UTF-8',
+    'Cache-Control': 'public, max-age=300',
+  }),
+);
@@ -67,21 +67,24 @@ projects.post('/:id/room-token', async (c) => {
   const id = c.req.param('id');
   const db = drizzle(c.env.DB);
 
-  const rows = await db
-    .select()
-    .from(projectsTable)
-    .where(eq(projectsTable.id, id));
+  // Signing only needs ids we already have, so mint the token while the
+  // ownership lookup is in flight and drop it if the check fails.
+  const [rows, { token, exp }] = await Promise.all([
+    db
+      .select({ workspaceId: projectsTable.workspaceId })
+      .from(projectsTable)
+      .where(eq(projectsTable.id, id)),
+    signRoomToken(
+      { projectId: id, userId },
+      c.env.ROOM_TOKEN_SECRET,
+      120, // 2-minute TTL
+    ),
+  ]);
 
   const row = rows[0];
   if (!row || row.workspaceId !== userId) {
     return c.json({ success: false, error: { message: 'Not found' } }, 404);
   }
 
-  const { token, exp } = await signRoomToken(
-    { projectId: id, userId },
-    c.env.ROOM_TOKEN_SECRET,
-    120, // 2-minute TTL
-  );
-
   return c.json({ success: true, data: { token, exp } });
 });
@@ -6,7 +6,7 @@ import { useAuth } from '@clerk/clerk-react';
 import Button from './ui/Button';
 import Dropdown from './ui/Dropdown';
 import Tooltip from './ui/Tooltip';
-import { postAi, type AiEndpoint } from '../lib/aiApi';
+import { postAi, readAiEvents, frameCoalescer, type AiEndpoint } from '../lib/aiApi';
 
 export interface AIMessage {
   id: string;
@@ -106,67 +106,51 @@ export function AIPanel({
 
     const endpoint: AiEndpoint = activeTab === 'nodes' ? 'generate-node' : 'generate-scene';
 
+    let accumulatedContent = '';
+    // Tokens arrive far faster than the screen refreshes; render once per frame
+    const render = frameCoalescer(() => updateMessage(assistantMessageId, {
+      content: accumulatedContent,
+      status: 'pending'
+    }));
+
     try {
       const response = await postAi(endpoint, { prompt, model: selectedModel, mode: generationMode }, getToken);
 
-      if (!response.body) {
-        throw new Error('No response body');
-      }
-
-      const reader = response.body.getReader();
-      const decoder = new TextDecoder();
-      let accumulatedContent = '';
+      for await (const data of readAiEvents(response)) {
+        if (data.type === 'progress' || data.type === 'stream') {
+          accumulatedContent += data.content;
+          render.schedule();
+        } else if (data.type === 'success') {
+          render.cancel();
+          accumulatedContent += '\n\n✅ ' + data.content;
+          updateMessage(assistantMessageId, {
+            content: accumulatedContent,
+            status: 'complete'
+          });
 
-      while (true) {
-        const { done, value } = await reader.read();
-        
-        if (done) break;
-
-        const chunk = decoder.decode(value);
-        const lines = chunk.split('\n');
-        
-        for (const line of lines) {
-          if (line.startsWith('data: ')) {
-            try {
-              const data = JSON.parse(line.slice(6));
-              
-              if (data.type === 'progress' || data.type === 'stream') {
-                accumulatedContent += data.content;
-                updateMessage(assistantMessageId, {
-                  content: accumulatedContent,
-                  status: 'pending'
-                });
-              } else if (data.type === 'success') {
-                accumulatedContent += '\n\n✅ ' + data.content;
-                updateMessage(assistantMessageId, {
-                  content: accumulatedContent,
-                  status: 'complete'
-                });
-
-                // Handle successful generation
-                if (data.node && onNodeGenerated) {
-                  onNodeGenerated(data.node);
-                } else if (data.scene && onSceneGenerated) {
-                  onSceneGenerated(data.scene);
-                }
-              } else if (data.type === 'error') {
-                accumulatedContent += '\n\n❌ ' + data.content;
-                updateMessage(assistantMessageId, {
-                  content: accumulatedContent,
-                  status: 'error'
-                });
-              } else if (data.type === 'done') {
-                updateMessage(assistantMessageId, {
-                  status: 'complete'
-                });
-              }
-            } catch (e) {
-              console.error('Failed to parse SSE data:', e);
-            }
+          // Handle successful generation
+          if (data.node && onNodeGenerated) {
+            onNodeGenerated(data.node);
+          } else if (data.scene && onSceneGenerated) {
+            onSceneGenerated(data.scene);
           }
+        } else if (data.type === 'error') {
+          render.cancel();
+          accumulatedContent += '\n\n❌ ' + data.content;
+          updateMessage(assistantMessageId, {
+            content: accumulatedContent,
+            status: 'error'
+          });
+        } else if (data.type === 'done') {
+          render.flush();
+          updateMessage(assistantMessageId, {
+            status: 'complete'
+          });
         }
       }
+      render.flush();
     } catch (error) {
+      render.cancel();
       updateMessage(assistantMessageId, {
         content: `Error: ${error}`,
         status: 'error'
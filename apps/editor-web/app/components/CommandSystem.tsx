@@ -21,7 +21,7 @@ import {
   Terminal
 } from 'lucide-react';
 import { useAuth } from '@clerk/clerk-react';
-import { postAi, type AiEndpoint } from '../lib/aiApi';
+import { postAi, readAiEvents, frameCoalescer, type AiEndpoint } from '../lib/aiApi';
 
 interface CommandSystemProps {
   onNodeGenerated?: (node: any) => void;
@@ -327,105 +327,95 @@ export function CommandSystem({
         break;
     }
 
+    let accumulatedContent = '';
+    let currentProgress = 10;
+    let currentStage = 'Generating';
+    let latestChunk = '';
+    // Tokens arrive far faster than the screen refreshes; render once per frame
+    const render = frameCoalescer(() => {
+      setGenerationProgress({
+        stage: currentStage,
+        content: latestChunk.slice(-100),
+        progress: currentProgress
+      });
+
+      updateResult(result.id, { 
+        content: accumulatedContent,
+        progress: currentProgress
+      });
+    });
+
     try {
       const response = await postAi(endpoint, requestBody, getToken);
 
-      if (!response.body) {
-        throw new Error('No response body');
-      }
-
-      const reader = response.body.getReader();
-      const decoder = new TextDecoder();
-      let accumulatedContent = '';
-      let currentProgress = 10;
-
-      while (true) {
-        const { done, value } = await reader.read();
-        if (done) break;
-
-        const chunk = decoder.decode(value);
-        const lines = chunk.split('\n');
-        
-        for (const line of lines) {
-          if (line.startsWith('data: ')) {
-            try {
-              const data = JSON.parse(line.slice(6));
-              
-              if (data.type === 'progress' || data.type === 'stream') {
-                accumulatedContent += data.content;
-                currentProgress = Math.min(currentProgress + 2, 90);
-                
-                let stage = 'Generating';
-                if (data.content.includes('analysis') || data.content.includes('analyzing')) {
-                  stage = 'Analyzing Requirements';
-                } else if (data.content.includes('creating') || data.content.includes('building')) {
-                  stage = 'Creating Structure';
-                } else if (data.content.includes('implementing') || data.content.includes('code')) {
-                  stage = 'Implementing Logic';
-                } else if (data.content.includes('optimizing') || data.content.includes('refining')) {
-                  stage = 'Optimizing Result';
-                }
-                
-                setGenerationProgress({
-                  stage,
-                  content: data.content.slice(-100),
-                  progress: currentProgress
-                });
-                
-                updateResult(result.id, { 
-                  content: accumulatedContent,
-                  progress: currentProgress
-                });
-              } else if (data.type === 'success') {
-                setGenerationProgress({
-                  stage: 'Complete',
-                  content: 'Generation completed successfully!',
-                  progress: 100
-                });
-                
-                updateResult(result.id, { 
-                  status: 'success', 
-                  content: accumulatedContent + '\n\n✅ ' + data.content,
-                  data: data.node || data.scene,
-                  progress: 100
-                });
-
-                if (data.node && onNodeGenerated) onNodeGenerated(data.node);
-                if (data.scene && onSceneGenerated) onSceneGenerated(data.scene);
-                if (data.node && onNodeModified) onNodeModified(data.node);
-                if (data.scene && onSceneModified) onSceneModified(data.scene);
-                
-                // Close all modals after successful generation
-                setTimeout(() => {
-                  setGenerationProgress(null);
-                  setIsOpen(false);
-                  setInput('');
-                  setSuggestions([]);
-                  setSelectedSuggestion(-1);
-                  setShowResults(false);
-                }, 2000);
-                
-              } else if (data.type === 'error') {
-                setGenerationProgress({
-                  stage: 'Error',
-                  content: 'Generation failed',
-                  progress: 0
-                });
-                
-                updateResult(result.id, { 
-                  status: 'error', 
-                  content: accumulatedContent + '\n\n❌ ' + data.content 
-                });
-                
-                setTimeout(() => setGenerationProgress(null), 3000);
-              }
-            } catch (e) {
-              console.error('Failed to parse SSE data:', e);
-            }
+      for await (const data of readAiEvents(response)) {
+        if (data.type === 'progress' || data.type === 'stream') {
+          accumulatedContent += data.content;
+          currentProgress = Math.min(currentProgress + 2, 90);
+
+          let stage = 'Generating';
+          if (data.content.includes('analysis') || data.content.includes('analyzing')) {
+            stage = 'Analyzing Requirements';
+          } else if (data.content.includes('creating') || data.content.includes('building')) {
+            stage = 'Creating Structure';
+          } else if (data.content.includes('implementing') || data.content.includes('code')) {
+            stage = 'Implementing Logic';
+          } else if (data.content.includes('optimizing') || data.content.includes('refining')) {
+            stage = 'Optimizing Result';
           }
+
+          currentStage = stage;
+          latestChunk = data.content;
+          render.schedule();
+        } else if (data.type === 'success') {
+          render.cancel();
+          setGenerationProgress({
+            stage: 'Complete',
+            content: 'Generation completed successfully!',
+            progress: 100
+          });
+
+          updateResult(result.id, { 
+            status: 'success', 
+            content: accumulatedContent + '\n\n✅ ' + data.content,
+            data: data.node || data.scene,
+            progress: 100
+          });
+
+          if (data.node && onNodeGenerated) onNodeGenerated(data.node);
+          if (data.scene && onSceneGenerated) onSceneGenerated(data.scene);
+          if (data.node && onNodeModified) onNodeModified(data.node);
+          if (data.scene && onSceneModified) onSceneModified(data.scene);
+
+          // Close all modals after successful generation
+          setTimeout(() => {
+            setGenerationProgress(null);
+            setIsOpen(false);
+            setInput('');
+            setSuggestions([]);
+            setSelectedSuggestion(-1);
+            setShowResults(false);
+          }, 2000);
+
+        } else if (data.type === 'error') {
+          render.cancel();
+          setGenerationProgress({
+            stage: 'Error',
+            content: 'Generation failed',
+            progress: 0
+          });
+
+          updateResult(result.id, { 
+            status: 'error', 
+            content: accumulatedContent + '\n\n❌ ' + data.content 
+          });
+
+          setTimeout(() => setGenerationProgress(null), 3000);
         }
       }
+      render.flush();
     } catch (error) {
+      render.cancel();
       setGenerationProgress({
         stage: 'Error',
         content: 'Network or processing error',
@@ -83,8 +83,6 @@ export function GeometryProvider({ children }: GeometryProviderProps) {
         // COMPILATION PHASE: Only when graph structure changes
         if (needsRecompilation || !compiledGraph) {
           const compileStart = performance.now();
-          console.log(`📦 Graph structure changed, recompiling...`);
-          
           compiledGraph = graphCompiler.compileGraph(nodes, edges);
           compiledGraphRef.current = compiledGraph;
           lastGraphHashRef.current = currentGraphHash;
@@ -95,7 +95,6 @@ const saveSceneToLocalStorage = (nodes: Node<GeometryNodeData>[], edges: Edge[])
     timestamp: Date.now()
   };
   localStorage.setItem('geometry-script-scene', JSON.stringify(sceneData));
-  console.log('Scene saved to localStorage');
 };
 
 const loadSceneFromLocalStorage = () => {
@@ -302,25 +301,16 @@ export default function GeometryNodeEditor({ projectId = null }: GeometryNodeEdi
 
   // AI Panel handlers
   const handleNodeGenerated = useCallback((node: any) => {
-    console.log('🤖 AI Generated Node:', node);
-    
-    // Check localStorage status before registration
-    const preStatus = nodeRegistry.getLocalStorageStatus();
-    console.log('📊 Pre-registration localStorage status:', preStatus);
-    
-    // Register the node in the client-side registry
+    // Register the node in the client-side registry; it persists and verifies
+    // the localStorage write itself and reports the outcome as `saved`
     const registrationResult = nodeRegistry.registerJsonNode(node);
     
     if (registrationResult.success) {
-      // Verify localStorage save with new status method
-      const postStatus = nodeRegistry.getLocalStorageStatus();
-      console.log('📊 Post-registration localStorage status:', postStatus);
-      
-      if (postStatus.available && postStatus.customNodesCount > preStatus.customNodesCount) {
-        showToast('success', `Successfully created and saved ${node.name} node! 💾 (${postStatus.customNodesCount} total)`, 5000);
-      } else if (postStatus.available) {
+      if (registrationResult.saved) {
+        showToast('success', `Successfully created and saved ${node.name} node! 💾`, 5000);
+      } else if (typeof window !== 'undefined' && typeof localStorage !== 'undefined') {
         // Try manual save as fallback
-        console.warn('⚠️ localStorage count unchanged, attempting manual save...');
+        console.warn('⚠️ localStorage save not verified, attempting manual save...');
         const manualSaveSuccess = nodeRegistry.forceSaveToLocalStorage();
         
         if (manualSaveSuccess) {
@@ -355,8 +345,6 @@ export default function GeometryNodeEditor({ projectId = null }: GeometryNodeEdi
   }, [setNodes, setEdges, showToast, fitView]);
 
   const handleNodeModified = useCallback((modifiedNode: any) => {
-    console.log('🔧 AI Modified Node:', modifiedNode);
-    
     // Update the registry with the modified node
     const registrationResult = nodeRegistry.registerJsonNode(modifiedNode);
     
@@ -5,7 +5,7 @@ import { Edit3, Loader2, Sparkles } from 'lucide-react';
 import { useAuth } from '@clerk/clerk-react';
 import Button from './ui/Button';
 import Dropdown from './ui/Dropdown';
-import { postAi, type AiEndpoint } from '../lib/aiApi';
+import { postAi, readAiEvents, type AiEndpoint } from '../lib/aiApi';
 
 interface ModificationPanelProps {
   onNodeModified?: (node: any) => void;
@@ -63,46 +63,23 @@ export function ModificationPanel({
 
       const response = await postAi(endpoint, requestBody, getToken);
 
-      if (!response.body) {
-        throw new Error('No response body');
-      }
-
-      const reader = response.body.getReader();
-      const decoder = new TextDecoder();
       let accumulatedContent = '';
 
-      while (true) {
-        const { done, value } = await reader.read();
-        
-        if (done) break;
-
-        const chunk = decoder.decode(value);
-        const lines = chunk.split('\n');
-        
-        for (const line of lines) {
-          if (line.startsWith('data: ')) {
-            try {
-              const data = JSON.parse(line.slice(6));
-              
-              if (data.type === 'progress') {
-                accumulatedContent += data.content;
-                setResult(accumulatedContent);
-              } else if (data.type === 'success') {
-                setResult('✅ ' + data.content);
-
-                // Handle successful modification
-                if (data.node && onNodeModified) {
-                  onNodeModified(data.node);
-                } else if (data.scene && onSceneModified) {
-                  onSceneModified(data.scene);
-                }
-              } else if (data.type === 'error') {
-                setResult('❌ ' + data.content);
-              }
-            } catch (e) {
-              console.error('Failed to parse SSE data:', e);
-            }
+      for await (const data of readAiEvents(response)) {
+        if (data.type === 'progress') {
+          accumulatedContent += data.content;
+          setResult(accumulatedContent);
+        } else if (data.type === 'success') {
+          setResult('✅ ' + data.content);
+
+          // Handle successful modification
+          if (data.node && onNodeModified) {
+            onNodeModified(data.node);
+          } else if (data.scene && onSceneModified) {
+            onSceneModified(data.scene);
           }
+        } else if (data.type === 'error') {
+          setResult('❌ ' + data.content);
         }
       }
     } catch (error) {
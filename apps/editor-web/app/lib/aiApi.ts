@@ -13,16 +13,103 @@ export async function postAi(
   body: Record<string, unknown>,
   getToken: () => Promise<string | null>,
 ): Promise<Response> {
-  const token = await getToken();
+  // Serialize the body while the token request is pending rather than after it
+  const pendingToken = getToken();
+  const payload = JSON.stringify({ ...body, catalog: buildCatalog() });
+  const token = await pendingToken;
   return fetch(`${API_BASE}/ai/${endpoint}`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
       ...(token ? { Authorization: `Bearer ${token}` } : {}),
     },
-    body: JSON.stringify({ ...body, catalog: buildCatalog() }),
+    body: payload,
   });
 }
 
+/** One `data:` event from an AI endpoint stream. */
+export interface AiEvent {
+  type: 'progress' | 'stream' | 'success' | 'error' | 'done';
+  content: string;
+  node?: any;
+  scene?: any;
+  errorType?: string;
+}
+
+/**
+ * Reads an AI endpoint's SSE body as parsed events.
+ * Network chunks don't line up with SSE frames, so a partial frame is carried
+ * over to the next read instead of being dropped. Decoding happens in a
+ * TextDecoderStream, which also handles multi-byte characters split across
+ * chunks.
+ */
+export async function* readAiEvents(response: Response): AsyncGenerator<AiEvent> {
+  if (!response.body) {
+    throw new Error('No response body');
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+
+  try {
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += value;
+
+      let start = 0;
+      let end: number;
+      while ((end = buffer.indexOf('\n\n', start)) !== -1) {
+        const frame = buffer.slice(start, end);
+        start = end + 2;
+        if (!frame.startsWith('data: ')) continue;
+
+        let event: AiEvent;
+        try {
+          event = JSON.parse(frame.slice(6));
+        } catch (e) {
+          console.error('Failed to parse SSE data:', e);
+          continue;
+        }
+        yield event;
+      }
+      buffer = buffer.slice(start);
+    }
+  } finally {
+    reader.releaseLock();
+  }
+}
+
+/**
+ * Coalesces per-token UI updates into at most one per animation frame.
+ * `schedule` queues `apply` for the next frame; `flush` runs a queued update
+ * now and `cancel` drops it (call one of them before a final state update so
+ * a late frame can't overwrite it).
+ */
+export function frameCoalescer(apply: () => void) {
+  let frame = 0;
+  return {
+    schedule() {
+      if (frame) return;
+      frame = requestAnimationFrame(() => {
+        frame = 0;
+        apply();
+      });
+    },
+    flush() {
+      if (!frame) return;
+      cancelAnimationFrame(frame);
+      frame = 0;
+      apply();
+    },
+    cancel() {
+      if (!frame) return;
+      cancelAnimationFrame(frame);
+      frame = 0;
+    },
+  };
+}
+
 /** Base URL for non-AI API calls (e.g. the public node catalog). */
 export const apiBase = API_BASE;
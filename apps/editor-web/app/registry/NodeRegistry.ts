@@ -292,11 +292,11 @@ export class NodeRegistry {
 
   // JSON Node Management Methods
 
-  // Save custom nodes to localStorage
-  private saveCustomNodesToLocalStorage(): void {
+  // Save custom nodes to localStorage; returns true once the write is verified
+  private saveCustomNodesToLocalStorage(): boolean {
     if (typeof window === 'undefined' || typeof localStorage === 'undefined') {
       console.warn('localStorage not available (server-side or unsupported browser)');
-      return; // Skip if not in browser
+      return false; // Skip if not in browser
     }
     
     try {
@@ -320,7 +320,9 @@ export class NodeRegistry {
         console.error('❌ localStorage save verification failed - content mismatch');
       } else {
         console.log('✅ localStorage save verified successfully');
+        return true;
       }
+      return false;
     } catch (error) {
       console.error('❌ Failed to save custom nodes to localStorage:', error);
       
@@ -332,6 +334,7 @@ export class NodeRegistry {
           console.error('🔒 localStorage access denied - check browser privacy settings');
         }
       }
+      return false;
     }
   }
 
@@ -374,7 +377,7 @@ export class NodeRegistry {
   }
 
   // Register a JSON node definition
-  registerJsonNode(jsonNode: JsonNodeDefinition): { success: boolean; error?: string } {
+  registerJsonNode(jsonNode: JsonNodeDefinition): { success: boolean; saved?: boolean; error?: string } {
     try {
       const nodeDefinition = jsonToNodeDefinition(jsonNode);
       
@@ -388,10 +391,10 @@ export class NodeRegistry {
       this.customNodes.set(jsonNode.type, jsonNode);
       
       // Save to localStorage
-      this.saveCustomNodesToLocalStorage();
+      const saved = this.saveCustomNodesToLocalStorage();
       
       console.log(`Registered custom node: ${jsonNode.type}`);
-      return { success: true };
+      return { success: true, saved };
     } catch (error) {
       return { success: false, error: `Failed to register node: ${error}` };
     }
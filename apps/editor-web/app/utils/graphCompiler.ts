@@ -93,12 +93,15 @@ export class GraphCompiler {
     this.compiledGraphCache.set(graphId, compiled);
     this.cleanupCompiledGraphCache();
 
-    console.log(`📦 Compiled graph ${graphId.substring(0, 8)}...`, {
-      totalNodes: nodes.length,
-      timeDependentNodes: timeDependentNodes.size,
-      staticNodes: staticNodes.size,
-      executionOrder: executionOrder.length
-    });
+    // Dev-only: production builds drop this block entirely
+    if (import.meta.env.DEV) {
+      console.log(`📦 Compiled graph ${graphId.substring(0, 8)}...`, {
+        totalNodes: nodes.length,
+        timeDependentNodes: timeDependentNodes.size,
+        staticNodes: staticNodes.size,
+        executionOrder: executionOrder.length
+      });
+    }
 
     return compiled;
   }
@@ -0,0 +1,57 @@
+import { describe, it, expect } from 'vitest';
+import { readAiEvents, type AiEvent } from '@/lib/aiApi';
+
+/**
+ * Regression test for SSE frame reassembly in readAiEvents.
+ *
+ * Network reads don't line up with SSE frames: a frame (or a multi-byte
+ * character inside it) can be split across two chunks. Both halves must be
+ * carried over and joined, not dropped.
+ */
+
+const encoder = new TextEncoder();
+
+/** A Response whose body arrives as the given byte chunks */
+const chunkedResponse = (...chunks: Uint8Array[]) =>
+  new Response(
+    new ReadableStream<Uint8Array>({
+      start(controller) {
+        for (const chunk of chunks) controller.enqueue(chunk);
+        controller.close();
+      },
+    }),
+  );
+
+const collect = async (response: Response) => {
+  const events: AiEvent[] = [];
+  for await (const event of readAiEvents(response)) events.push(event);
+  return events;
+};
+
+const body =
+  'data: {"type":"stream","content":"héllo 🎲"}\n\n' +
+  'data: {"type":"done","content":""}\n\n';
+
+describe('readAiEvents', () => {
+  it('joins a frame and a multi-byte character split across two reads', async () => {
+    const bytes = encoder.encode(body);
+    // Cut inside the 4-byte dice emoji, which is also inside the first frame
+    const cut = encoder.encode('data: {"type":"stream","content":"héllo ').length + 2;
+
+    const events = await collect(chunkedResponse(bytes.slice(0, cut), bytes.slice(cut)));
+
+    expect(events).toEqual([
+      { type: 'stream', content: 'héllo 🎲' },
+      { type: 'done', content: '' },
+    ]);
+  });
+
+  it('joins a frame whose blank-line terminator is split across reads', async () => {
+    const bytes = encoder.encode(body);
+    const cut = bytes.indexOf(10 /* \n */) + 1;
+
+    const events = await collect(chunkedResponse(bytes.slice(0, cut), bytes.slice(cut)));
+
+    expect(events.map(e => e.type)).toEqual(['stream', 'done']);
+  });
+});
@@ -1,5 +1,6 @@
 import { JsonNodeDefinition } from './jsonNodes';
 import {
+  AITask,
   AIRequest,
   CreateNodeRequest,
   PlanSceneRequest,
@@ -13,10 +14,15 @@ import {
 import {
   buildNodeExamples,
   buildScenePresets,
-  buildPromptForTask
+  buildPromptForTask,
+  buildPromptPartsForTask,
+  buildModifyNodePrompt
 } from './contextBuilders';
+import type { PromptParts } from './contextBuilders';
 import { validateNodeCode, validateSceneJSON, validateAIRequest } from './validators';
 import { createStreamingSession, getAvailableModels } from './aiClient';
+import { extractJsonObject, JsonObjectScanner } from './jsonResponse';
+import { DiffApplicator } from './diffApplicator';
 import { 
   StandardResponse, 
   createSuccessResponse, 
@@ -27,18 +33,58 @@ import {
   validationToResponse 
 } from './errorHandler';
 
+/**
+ * Default per-task model routing. Planning only picks node ids from the
+ * catalog, so it goes to a small model; everything else falls back to the
+ * agent's default model.
+ *
+ * This does not affect the served /ai routes: they always forward the client's
+ * selected model, which takes precedence, and plan_scene is only reached
+ * through the legacy generateScene path, which the apps do not call.
+ */
+const DEFAULT_TASK_MODELS: Partial<Record<AITask, string>> = {
+  plan_scene: 'anthropic/claude-haiku-4.5',
+};
+
+// Planning returns a short id list; don't let it wait as long as full generation.
+const PLAN_TIMEOUT_MS = 30_000;
+
+// Diff application holds no per-request state, so every agent shares one.
+const diffApplicator = new DiffApplicator();
+
 /**
  * Main AI Agent class for systematic geometry node operations
  */
 export class GeometryAIAgent {
   private model: string;
+  private models: Partial<Record<AITask, string>>;
   private apiKey: string;
   private catalog: string;
-
-  constructor(opts: { apiKey: string; model?: string; catalog?: string } = { apiKey: '' }) {
+  private debug: boolean;
+
+  constructor(
+    opts: {
+      apiKey: string;
+      model?: string;
+      models?: Partial<Record<AITask, string>>;
+      catalog?: string;
+      /** Dump failing model output and generated code to the console */
+      debug?: boolean;
+    } = { apiKey: '' }
+  ) {
     this.apiKey = opts.apiKey;
     this.model = opts.model ?? 'anthropic/claude-3.5-sonnet';
+    this.models = { ...DEFAULT_TASK_MODELS, ...opts.models };
     this.catalog = opts.catalog ?? '';
+    this.debug = opts.debug ?? false;
+  }
+
+  /**
+   * Resolve the model for a task: an explicit per-call model wins, then the
+   * per-task routing table, then the agent default.
+   */
+  private modelFor(task: AITask, modelName?: string): string {
+    return modelName || this.models[task] || this.model;
   }
 
   /**
@@ -83,26 +129,31 @@ export class GeometryAIAgent {
   }
 
   /**
-   * Stream a specific AI task for real-time feedback with error handling
+   * Stream a specific AI task for real-time feedback.
+   * Yields model text only; failures are thrown as a StandardError rather than
+   * mixed into the stream as text. `abortSignal` cancels the provider request.
    */
-  async *streamTask(request: AIRequest, modelName?: string): AsyncGenerator<string> {
+  async *streamTask(request: AIRequest, modelName?: string, abortSignal?: AbortSignal): AsyncGenerator<string> {
     // Validate the request
     const validation = validateAIRequest(request);
     if (!validation.success) {
-      yield `Validation Error: ${validation.errors.join(', ')}`;
-      return;
+      throw createError(
+        ErrorType.VALIDATION_ERROR,
+        validation.errors.join(', '),
+        validation,
+        'streamTask'
+      );
     }
 
     try {
-      const prompt = buildPromptForTask(request, this.catalog);
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
+      const prompt = buildPromptPartsForTask(request, this.catalog);
+      const result = createStreamingSession(
+        prompt, this.apiKey, this.modelFor(request.task, modelName), undefined, abortSignal
+      );
 
-      for await (const chunk of result.textStream) {
-        yield chunk;
-      }
+      yield* result.textStream;
     } catch (error) {
-      const standardError = handleError(error, 'streamTask');
-      yield `Error: ${standardError.message}`;
+      throw handleError(error, 'streamTask');
     }
   }
 
@@ -124,13 +175,8 @@ ${nodeExamples}`;
 ${request.validator_report}`;
       }
 
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
-      
-      // Collect full response from stream
-      let fullResponse = '';
-      for await (const chunk of result.textStream) {
-        fullResponse += chunk;
-      }
+      // Collect the response, stopping once the JSON object is complete
+      const fullResponse = await this.collectJsonResponse(prompt, this.modelFor('create_node', modelName));
       
       // Return the generated JSON response
       return createSuccessResponse(fullResponse);
@@ -153,13 +199,12 @@ SCENE_IDEA: "${request.scene_idea}"
 CATALOG:
 ${catalog}`;
 
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
+      const result = createStreamingSession(
+        prompt, this.apiKey, this.modelFor('plan_scene', modelName), PLAN_TIMEOUT_MS
+      );
       
       // Collect full response from stream
-      let fullResponse = '';
-      for await (const chunk of result.textStream) {
-        fullResponse += chunk;
-      }
+      const fullResponse = await this.collectText(result.textStream);
       
       return createSuccessResponse(fullResponse);
     } catch (error) {
@@ -181,17 +226,14 @@ SELECTED_NODE_IDS: ${JSON.stringify(request.selected_node_ids)}
 SCENE_PRESETS:
 ${scenePresets}`;
 
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
-      
-      // Collect full response from stream
-      let fullResponse = '';
-      for await (const chunk of result.textStream) {
-        fullResponse += chunk;
-      }
+      // Collect the response, stopping once the JSON object is complete
+      const fullResponse = await this.collectJsonResponse(prompt, this.modelFor('compose_scene', modelName));
       
+      const cleanedResponse = extractJsonObject(fullResponse);
+
       // Try to validate the generated scene JSON
       try {
-        const sceneJSON = JSON.parse(fullResponse);
+        const sceneJSON = JSON.parse(cleanedResponse);
         const sceneValidation = validateSceneJSON(sceneJSON);
         
         if (!sceneValidation.success) {
@@ -204,7 +246,7 @@ ${scenePresets}`;
           return createErrorResponse(error);
         }
         
-        return createSuccessResponse(fullResponse, sceneValidation.warnings);
+        return createSuccessResponse(cleanedResponse, sceneValidation.warnings);
       } catch (parseError) {
         const error = createError(
           ErrorType.PARSING_ERROR,
@@ -229,13 +271,10 @@ ${scenePresets}`;
 OLD_SCENE_JSON: ${JSON.stringify(request.old_scene_json, null, 2)}
 CHANGE_REQUEST: "${request.change_request}"`;
 
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
+      const result = createStreamingSession(prompt, this.apiKey, this.modelFor('diff_scene', modelName));
       
       // Collect full response from stream
-      let fullResponse = '';
-      for await (const chunk of result.textStream) {
-        fullResponse += chunk;
-      }
+      const fullResponse = await this.collectText(result.textStream);
       
       return createSuccessResponse(fullResponse);
     } catch (error) {
@@ -249,18 +288,13 @@ CHANGE_REQUEST: "${request.change_request}"`;
    */
   private async generateSceneWithErrorHandling(request: GenerateSceneRequest, modelName?: string): Promise<StandardResponse<string>> {
     try {
-      const prompt = buildPromptForTask(request, this.catalog);
+      const prompt = buildPromptPartsForTask(request, this.catalog);
       
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
-      
-      // Collect full response from stream
-      let fullResponse = '';
-      for await (const chunk of result.textStream) {
-        fullResponse += chunk;
-      }
+      // Collect the response, stopping once the JSON object is complete
+      const fullResponse = await this.collectJsonResponse(prompt, this.modelFor('generate_scene', modelName));
       
       // Clean up the response - remove any markdown formatting
-      const cleanedResponse = this.cleanJsonResponse(fullResponse);
+      const cleanedResponse = extractJsonObject(fullResponse);
       
       // Try to validate the generated scene JSON
       try {
@@ -319,46 +353,47 @@ CHANGE_REQUEST: "${request.change_request}"`;
   }
 
   /**
-   * Clean JSON response by removing markdown formatting and extra text
+   * Run a JSON-producing session and read it until the top-level object closes,
+   * then abort the provider request so trailing prose is neither waited for nor
+   * billed. Breaking out of `textStream` alone would leave the request running.
    */
-  private cleanJsonResponse(response: string): string {
-    // Remove markdown code blocks
-    let cleaned = response.replace(/```json\s*/g, '').replace(/```\s*/g, '');
-    
-    // Try to find JSON object boundaries
-    const jsonStart = cleaned.indexOf('{');
-    const jsonEnd = cleaned.lastIndexOf('}');
-    
-    if (jsonStart !== -1 && jsonEnd !== -1 && jsonEnd > jsonStart) {
-      cleaned = cleaned.substring(jsonStart, jsonEnd + 1);
+  private async collectJsonResponse(prompt: string | PromptParts, modelName: string): Promise<string> {
+    const stop = new AbortController();
+    const result = createStreamingSession(prompt, this.apiKey, modelName, undefined, stop.signal);
+    const scanner = new JsonObjectScanner();
+    const parts: string[] = [];
+    try {
+      for await (const chunk of result.textStream) {
+        parts.push(chunk);
+        if (scanner.push(chunk)) break;
+      }
+    } finally {
+      stop.abort();
     }
-    
-    return cleaned.trim();
+    return parts.join('');
+  }
+
+  /**
+   * Read a text stream to the end. Chunks are joined once at the end rather
+   * than re-concatenated on every token.
+   */
+  private async collectText(textStream: AsyncIterable<string>): Promise<string> {
+    const parts: string[] = [];
+    for await (const chunk of textStream) {
+      parts.push(chunk);
+    }
+    return parts.join('');
   }
 
   /**
    * Extract JSON from response that might contain other text
    */
   private extractJsonFromResponse(response: string): string | null {
-    try {
-      // Look for JSON object boundaries
-      const patterns = [
-        /\{[\s\S]*\}/,  // Basic object pattern
-        /\{[\s\S]*?"edges"[\s\S]*?\}/, // Look for scene structure
-        /\{[\s\S]*?"nodes"[\s\S]*?\}/  // Look for nodes array
-      ];
-      
-      for (const pattern of patterns) {
-        const match = response.match(pattern);
-        if (match) {
-          return match[0];
-        }
-      }
-      
-      return null;
-    } catch (error) {
-      return null;
-    }
+    // The first `{` through the last `}`. The "edges"/"nodes" regex fallbacks
+    // this used to try after that could never match when it did not.
+    const start = response.indexOf('{');
+    const end = response.lastIndexOf('}');
+    return start !== -1 && end > start ? response.slice(start, end + 1) : null;
   }
 
   /**
@@ -366,7 +401,9 @@ CHANGE_REQUEST: "${request.change_request}"`;
    */
   private attemptSceneFix(scene: any, errors: string[]): any | null {
     try {
-      const fixedScene = JSON.parse(JSON.stringify(scene)); // Deep clone
+      // Callers pass a scene they just parsed and own, so fix it in place
+      // instead of round-tripping it through JSON for a deep clone
+      const fixedScene = scene;
       
       // Fix missing nodes array
       if (!fixedScene.nodes || !Array.isArray(fixedScene.nodes)) {
@@ -417,44 +454,45 @@ CHANGE_REQUEST: "${request.change_request}"`;
   }
 
   /**
-   * Stream a single-step scene generation task
+   * Stream a single-step scene generation task.
+   * `abortSignal` cancels the provider request.
    */
-  async *streamGenerateScene(request: GenerateSceneRequest, modelName?: string): AsyncGenerator<string> {
-    const prompt = buildPromptForTask(request, this.catalog);
+  async *streamGenerateScene(
+    request: GenerateSceneRequest,
+    modelName?: string,
+    abortSignal?: AbortSignal
+  ): AsyncGenerator<string> {
+    const prompt = buildPromptPartsForTask(request, this.catalog);
     
-    const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
+    const result = createStreamingSession(
+      prompt, this.apiKey, this.modelFor('generate_scene', modelName), undefined, abortSignal
+    );
     
-    for await (const chunk of result.textStream) {
-      yield chunk;
-    }
+    yield* result.textStream;
   }
 
   /**
    * Stream node generation with real-time feedback
    */
-  async *streamNodeGeneration(prompt: string, modelName?: string): AsyncGenerator<string> {
+  streamNodeGeneration(prompt: string, modelName?: string): AsyncGenerator<string> {
     const request: CreateNodeRequest = {
       task: 'create_node',
       behavior: prompt
     };
 
-    for await (const chunk of this.streamTask(request, modelName)) {
-      yield chunk;
-    }
+    return this.streamTask(request, modelName);
   }
 
   /**
    * Stream scene generation with real-time feedback
    */
-  async *streamSceneGeneration(prompt: string, modelName?: string): AsyncGenerator<string> {
+  streamSceneGeneration(prompt: string, modelName?: string): AsyncGenerator<string> {
     const request: PlanSceneRequest = {
       task: 'plan_scene',
       scene_idea: prompt
     };
 
-    for await (const chunk of this.streamTask(request, modelName)) {
-      yield chunk;
-    }
+    return this.streamTask(request, modelName);
   }
 
   /**
@@ -488,7 +526,7 @@ CHANGE_REQUEST: "${request.change_request}"`;
         return null;
       }
     } catch (error) {
-      yield `Error: ${error}`;
+      yield `Error: ${handleError(error, 'generateNode').message}`;
       return null;
     }
   }
@@ -498,31 +536,17 @@ CHANGE_REQUEST: "${request.change_request}"`;
    */
   public parseJsonNodeDefinition(jsonResponse: string): JsonNodeDefinition | null {
     try {
-      console.log('🔍 Parsing JSON response length:', jsonResponse.length);
-      
-      // Clean the response to extract just the JSON object
-      let cleanedResponse = jsonResponse.trim();
-      
-      // Remove markdown code blocks if present
-      cleanedResponse = cleanedResponse.replace(/```json\s*/, '').replace(/```\s*$/, '');
-      cleanedResponse = cleanedResponse.replace(/```\s*/, '').replace(/```\s*$/, '');
+      // Strip markdown fences and trim to the JSON object
+      const jsonStr = extractJsonObject(jsonResponse);
       
-      // Find JSON object boundaries
-      const jsonStart = cleanedResponse.indexOf('{');
-      const jsonEnd = cleanedResponse.lastIndexOf('}');
-      
-      if (jsonStart === -1 || jsonEnd === -1) {
+      if (!jsonStr.startsWith('{')) {
         console.error('❌ No JSON object found in response');
-        console.log('Response preview:', cleanedResponse.substring(0, 200) + '...');
+        if (this.debug) console.log('Response preview:', jsonStr.substring(0, 200) + '...');
         return null;
       }
       
-      const jsonStr = cleanedResponse.substring(jsonStart, jsonEnd + 1);
-      console.log('📝 Extracted JSON string length:', jsonStr.length);
-      
       // Parse the JSON
       const nodeDefinition = JSON.parse(jsonStr) as JsonNodeDefinition;
-      console.log('✅ Successfully parsed JSON with type:', nodeDefinition.type);
       
              // Validate required fields
        if (!nodeDefinition.type || !nodeDefinition.name) {
@@ -553,8 +577,10 @@ CHANGE_REQUEST: "${request.change_request}"`;
          for (const pattern of forbiddenPatterns) {
            if (pattern.test(nodeDefinition.executeCode)) {
              console.error('❌ Forbidden function detected in executeCode:', pattern);
-             console.log('Code:', nodeDefinition.executeCode);
-             console.log('💡 Only use THREE.js built-in classes and standard JavaScript. See the constraints in the context.');
+             if (this.debug) {
+               console.log('Code:', nodeDefinition.executeCode);
+               console.log('💡 Only use THREE.js built-in classes and standard JavaScript. See the constraints in the context.');
+             }
              return null;
            }
          }
@@ -565,18 +591,18 @@ CHANGE_REQUEST: "${request.change_request}"`;
       if (!nodeDefinition.author) nodeDefinition.author = 'AI Generated';
       if (!nodeDefinition.created) nodeDefinition.created = new Date().toISOString();
       if (!nodeDefinition.tags) nodeDefinition.tags = [nodeDefinition.category || 'generated'];
-      
-      console.log('✅ Valid node definition:', nodeDefinition.type, nodeDefinition.name);
       return nodeDefinition;
       
     } catch (error) {
-      console.error('❌ Failed to parse JSON response:', error);
-      console.error('Error details:', {
-        message: error instanceof Error ? error.message : String(error),
-        stack: error instanceof Error ? error.stack : undefined
-      });
-      
-      console.log('Response that failed to parse:', jsonResponse.substring(0, 500) + '...');
+      console.error('❌ Failed to parse JSON response:', error instanceof Error ? error.message : String(error));
+
+      if (this.debug) {
+        console.error('Error details:', {
+          message: error instanceof Error ? error.message : String(error),
+          stack: error instanceof Error ? error.stack : undefined
+        });
+        console.log('Response that failed to parse:', jsonResponse.substring(0, 500) + '...');
+      }
       return null;
     }
   }
@@ -649,20 +675,15 @@ CHANGE_REQUEST: "${request.change_request}"`;
    */
   private async modifyNodeWithErrorHandling(request: ModifyNodeRequest, modelName?: string): Promise<StandardResponse<string>> {
     try {
-      const prompt = buildPromptForTask(request, this.catalog);
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
+      // The diff targets this exact text, so serialize once for prompt and apply
+      const nodeJson = JSON.stringify(request.nodeData, null, 2);
+      const prompt = buildModifyNodePrompt(request, nodeJson);
+      const result = createStreamingSession(prompt, this.apiKey, this.modelFor('modify_node', modelName));
       
-      let diffContent = '';
-      for await (const chunk of result.textStream) {
-        diffContent += chunk;
-      }
+      const diffContent = await this.collectText(result.textStream);
 
-      // Import DiffApplicator
-      const { DiffApplicator } = await import('./diffApplicator');
-      const diffApplicator = new DiffApplicator();
-      
       // Apply the generated diff to the node
-      const applyResult = await diffApplicator.applyNodeDiff(request.nodeData, diffContent);
+      const applyResult = await diffApplicator.applyNodeDiff(nodeJson, diffContent);
       
       if (!applyResult.success) {
         const error = createError(
@@ -686,16 +707,11 @@ CHANGE_REQUEST: "${request.change_request}"`;
    */
   private async modifySceneWithErrorHandling(request: ModifySceneRequest, modelName?: string): Promise<StandardResponse<string>> {
     try {
-      const prompt = buildPromptForTask(request, this.catalog);
-      const result = await createStreamingSession(prompt, this.apiKey, modelName || this.model);
-      
-      let fullResponse = '';
-      for await (const chunk of result.textStream) {
-        fullResponse += chunk;
-      }
+      const prompt = buildPromptPartsForTask(request, this.catalog);
+      const fullResponse = await this.collectJsonResponse(prompt, this.modelFor('modify_scene', modelName));
 
       // Clean up the response - remove any markdown formatting
-      const cleanedResponse = this.cleanJsonResponse(fullResponse);
+      const cleanedResponse = extractJsonObject(fullResponse);
       
       // Try to validate the generated scene JSON
       try {
@@ -722,7 +738,8 @@ CHANGE_REQUEST: "${request.change_request}"`;
           return createErrorResponse(error);
         }
         
-        return createSuccessResponse(cleanedResponse, sceneValidation.warnings);
+        // Compact JSON: callers splice this straight into a single-line SSE frame
+        return createSuccessResponse(JSON.stringify(modifiedScene), sceneValidation.warnings);
         
       } catch (parseError) {
         const error = createError(
@@ -1,5 +1,6 @@
 import { createOpenRouter } from '@openrouter/ai-sdk-provider';
-import { streamText } from 'ai';
+import { streamText, type CoreSystemMessage, type CoreUserMessage } from 'ai';
+import type { PromptParts } from './contextBuilders';
 
 // Base system prompt for Geometry-Node AI
 export const BASE_SYSTEM_PROMPT = `You are an expert Geometry-Node engineer working in the repository 'geometry-node' (branch 'product').
@@ -12,20 +13,93 @@ Follow these rules at all times:
 4. If a validator report is present, fix every error before doing anything else.
 5. Output **pure code / JSON only**—no markdown framing, no extra prose.`;
 
+// Providers keyed by API key. In practice there is one key per deployment, so
+// this holds a single entry and every session reuses the same provider.
+const providers = new Map<string, ReturnType<typeof createOpenRouter>>();
+
+function providerFor(apiKey: string) {
+  let provider = providers.get(apiKey);
+  if (!provider) {
+    provider = createOpenRouter({ apiKey });
+    providers.set(apiKey, provider);
+  }
+  return provider;
+}
+
+// Longest a model call may go without sending a chunk, including the wait for
+// the first one. A stalled provider otherwise holds the SSE response (and the
+// client's spinner) open indefinitely; a long but healthy stream never trips it.
+export const DEFAULT_SESSION_TIMEOUT_MS = 120_000;
+
+// Immutable message pieces shared by every session, built once per isolate.
+const SYSTEM_MESSAGE: CoreSystemMessage = Object.freeze({
+  role: 'system',
+  content: BASE_SYSTEM_PROMPT,
+} as const);
+const CACHE_BREAKPOINT = Object.freeze({
+  openrouter: Object.freeze({ cacheControl: Object.freeze({ type: 'ephemeral' }) }),
+});
+
+/**
+ * An abort signal that fires once `timeoutMs` passes without a `reset`.
+ * Aborts with a TimeoutError, like AbortSignal.timeout, so handleError reports
+ * it as a network error.
+ */
+function idleTimeout(timeoutMs: number) {
+  const controller = new AbortController();
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  const clear = () => clearTimeout(timer);
+  const reset = () => {
+    clear();
+    timer = setTimeout(
+      () => controller.abort(new DOMException(`No model output for ${timeoutMs} ms`, 'TimeoutError')),
+      timeoutMs
+    );
+  };
+  reset();
+  return { signal: controller.signal, reset, clear };
+}
+
 /**
  * Creates a streaming text generation session.
  * The OpenRouter API key is injected per call (Workers have no module-level env).
+ * Passing PromptParts marks the prefix with an ephemeral cache breakpoint so
+ * providers that support prompt caching can reuse it across requests.
+ * The session is aborted once the model sends nothing for `timeoutMs`; every
+ * chunk restarts the clock, so only the wait for a chunk is bounded.
+ * `abortSignal` cancels the provider request too. Callers that stop reading
+ * early must abort it: `textStream` is one branch of a tee, so leaving its
+ * for-await does not end the upstream fetch.
+ * The request starts immediately; read `textStream` to consume the response.
  */
-export async function createStreamingSession(
-  prompt: string,
+export function createStreamingSession(
+  prompt: string | PromptParts,
   apiKey: string,
-  modelName: string = 'anthropic/claude-sonnet-4.6'
+  modelName: string = 'anthropic/claude-sonnet-4.6',
+  timeoutMs: number = DEFAULT_SESSION_TIMEOUT_MS,
+  abortSignal?: AbortSignal
 ) {
-  const openrouter = createOpenRouter({ apiKey });
-  return await streamText({
+  const openrouter = providerFor(apiKey);
+
+  const user: CoreUserMessage = typeof prompt === 'string' || !prompt.prefix
+    ? { role: 'user', content: typeof prompt === 'string' ? prompt : prompt.suffix }
+    : {
+        role: 'user',
+        content: [
+          { type: 'text', text: prompt.prefix, providerOptions: CACHE_BREAKPOINT },
+          { type: 'text', text: prompt.suffix },
+        ],
+      };
+
+  const timeout = idleTimeout(timeoutMs);
+
+  return streamText({
     model: openrouter(modelName),
-    prompt,
-    system: BASE_SYSTEM_PROMPT,
+    messages: [SYSTEM_MESSAGE, user],
+    abortSignal: abortSignal ? AbortSignal.any([abortSignal, timeout.signal]) : timeout.signal,
+    onChunk: timeout.reset,
+    onFinish: timeout.clear,
+    onError: timeout.clear,
   });
 }
 
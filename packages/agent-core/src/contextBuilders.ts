@@ -1,7 +1,16 @@
+// The example blocks are static, so they are rendered once per isolate
+// instead of being re-stringified for every prompt.
+let nodeExamples: string | undefined;
+let sceneExamples: string | undefined;
+
 /**
  * Builds JSON examples of node definitions for the AI model
  */
 export function buildNodeExamples(): string {
+  return (nodeExamples ??= renderNodeExamples());
+}
+
+function renderNodeExamples(): string {
   const cubeExample = {
     "type": "cube",
     "name": "Cube",
@@ -240,6 +249,10 @@ RULES:
  * Builds comprehensive scene examples for better AI guidance
  */
 export function buildSceneExamples(): string {
+  return (sceneExamples ??= renderSceneExamples());
+}
+
+function renderSceneExamples(): string {
   // Simple example scene
   const simpleExample = {
     nodes: [
@@ -538,31 +551,7 @@ SCENE_PRESETS:
 ${buildScenePresets()}`;
 
     case 'generate_scene':
-      return `TASK: "generate_scene"
-SCENE_DESCRIPTION: "${task.scene_description}"
-
-${buildSceneGenerationGuidelines()}
-
-COMPREHENSIVE NODE CATALOG:
-The following catalog contains ALL available nodes organized by category, with complete input/output information, usage patterns, and common parameter values. Use this as your primary reference for node selection and configuration.
-
-${catalog}
-
-SCENE_EXAMPLES:
-Here are working examples of properly structured scenes:
-
-${buildSceneExamples()}
-
-CRITICAL INSTRUCTIONS:
-1. Use ONLY nodes from the catalog above
-2. Follow the exact handle naming convention (geometry-out → geometry-in, etc.)
-3. Use the usagePatterns and commonParameters from the catalog for each node
-4. Every scene MUST end with an output node
-5. Apply materials using set-material nodes (geometry + material → set-material → output)
-6. Use the connectionPatterns as your guide for data flow
-
-RESPONSE FORMAT:
-Return ONLY a valid JSON object with the complete scene structure. No explanations, no markdown formatting, just the raw JSON. The response should contain "nodes" and "edges" arrays following the exact structure shown in the examples.`;
+      return joinPromptParts(buildGenerateScenePromptParts(task, catalog));
 
     case 'diff_scene':
       return `TASK: "diff_scene"
@@ -581,14 +570,19 @@ CHANGE_REQUEST: "${task.change_request}"`;
 }
 
 /**
- * Builds a prompt for modifying an existing node
+ * Builds a prompt for modifying an existing node.
+ * Pass `nodeJson` when the caller already holds the pretty-printed node, so the
+ * exact text the diff will target is serialized only once.
  */
-function buildModifyNodePrompt(request: any): string {
+export function buildModifyNodePrompt(
+  request: any,
+  nodeJson: string = JSON.stringify(request.nodeData, null, 2)
+): string {
   return `TASK: "modify_node"
 MODIFICATION_DESCRIPTION: "${request.modification_description}"
 
 ORIGINAL_NODE_JSON:
-${JSON.stringify(request.nodeData, null, 2)}
+${nodeJson}
 
 NODE_EXAMPLES:
 ${buildNodeExamples()}
@@ -616,15 +610,78 @@ RESPONSE FORMAT:
 Return ONLY the diff patch using the SEARCH/REPLACE format. No explanations, no markdown, just the raw diff.`;
 }
 
+/**
+ * Prompt split into a request-independent prefix and a per-request suffix.
+ * Providers can cache the prefix, so everything that does not change between
+ * requests (catalog, guidelines, rules, response format) belongs in it.
+ */
+export interface PromptParts {
+  prefix: string;
+  suffix: string;
+}
+
+/**
+ * Builds a prompt for a specific AI task, split for prompt caching.
+ * Tasks without a cacheable layout return their whole prompt as the suffix.
+ */
+export function buildPromptPartsForTask(task: any, catalog: string): PromptParts {
+  switch (task.task) {
+    case 'generate_scene':
+      return buildGenerateScenePromptParts(task, catalog);
+
+    case 'modify_scene':
+      return buildModifyScenePromptParts(task, catalog);
+
+    default:
+      return { prefix: '', suffix: buildPromptForTask(task, catalog) };
+  }
+}
+
 /**
  * Builds a prompt for modifying an existing scene
  */
 function buildModifyScenePrompt(request: any, catalog: string): string {
-  return `TASK: "modify_scene"
-MODIFICATION_DESCRIPTION: "${request.modification_description}"
+  return joinPromptParts(buildModifyScenePromptParts(request, catalog));
+}
 
-ORIGINAL_SCENE_JSON:
-${JSON.stringify(request.sceneData, null, 2)}
+/** Join prompt parts into the single-string prompt */
+export function joinPromptParts({ prefix, suffix }: PromptParts): string {
+  return `${prefix}\n\n${suffix}`;
+}
+
+function buildGenerateScenePromptParts(request: any, catalog: string): PromptParts {
+  const prefix = `TASK: "generate_scene"
+
+${buildSceneGenerationGuidelines()}
+
+COMPREHENSIVE NODE CATALOG:
+The following catalog contains ALL available nodes organized by category, with complete input/output information, usage patterns, and common parameter values. Use this as your primary reference for node selection and configuration.
+
+${catalog}
+
+SCENE_EXAMPLES:
+Here are working examples of properly structured scenes:
+
+${buildSceneExamples()}
+
+CRITICAL INSTRUCTIONS:
+1. Use ONLY nodes from the catalog above
+2. Follow the exact handle naming convention (geometry-out → geometry-in, etc.)
+3. Use the usagePatterns and commonParameters from the catalog for each node
+4. Every scene MUST end with an output node
+5. Apply materials using set-material nodes (geometry + material → set-material → output)
+6. Use the connectionPatterns as your guide for data flow
+
+RESPONSE FORMAT:
+Return ONLY a valid JSON object with the complete scene structure. No explanations, no markdown formatting, just the raw JSON. The response should contain "nodes" and "edges" arrays following the exact structure shown in the examples.`;
+
+  const suffix = `SCENE_DESCRIPTION: "${request.scene_description}"`;
+
+  return { prefix, suffix };
+}
+
+function buildModifyScenePromptParts(request: any, catalog: string): PromptParts {
+  const prefix = `TASK: "modify_scene"
 
 COMPREHENSIVE NODE CATALOG:
 The following catalog contains ALL available nodes organized by category, with complete input/output information, usage patterns, and common parameter values. Use this as your primary reference for node selection and configuration.
@@ -658,4 +715,11 @@ CRITICAL INSTRUCTIONS:
 
 RESPONSE FORMAT:
 Return ONLY a valid JSON object with the complete modified scene structure. No explanations, no markdown formatting, just the raw JSON. The response should contain "nodes" and "edges" arrays following the exact structure of the original scene.`;
-}
\ No newline at end of file
+
+  const suffix = `MODIFICATION_DESCRIPTION: "${request.modification_description}"
+
+ORIGINAL_SCENE_JSON:
+${JSON.stringify(request.sceneData, null, 2)}`;
+
+  return { prefix, suffix };
+}
@@ -21,6 +21,11 @@ interface DiffStrategy {
 
 const BUFFER_LINES = 40;
 
+// SEARCH/REPLACE block matcher, compiled once. matchAll() clones it, so the
+// shared lastIndex is never touched.
+const DIFF_BLOCK_RE =
+  /(?:^|\n)<<<<<<< SEARCH\s*\n([\s\S]*?)(?:\n)?(?:(?<=\n)=======\s*\n)([\s\S]*?)(?:\n)?(?:(?<=\n)>>>>>>> REPLACE)(?=\n|$)/g;
+
 function getSimilarity(original: string, search: string): number {
   if (search === "") {
     return 0;
@@ -89,9 +94,7 @@ class SimpleDiffStrategy implements DiffStrategy {
 
   async applyDiff(originalContent: string, diffContent: string): Promise<DiffResult> {
     // Parse the diff format: <<<<<<< SEARCH ... ======= ... >>>>>>> REPLACE
-    const matches = [...diffContent.matchAll(
-      /(?:^|\n)<<<<<<< SEARCH\s*\n([\s\S]*?)(?:\n)?(?:(?<=\n)=======\s*\n)([\s\S]*?)(?:\n)?(?:(?<=\n)>>>>>>> REPLACE)(?=\n|$)/g
-    )];
+    const matches = [...diffContent.matchAll(DIFF_BLOCK_RE)];
 
     if (matches.length === 0) {
       return {
@@ -101,7 +104,7 @@ class SimpleDiffStrategy implements DiffStrategy {
     }
 
     const lineEnding = originalContent.includes("\r\n") ? "\r\n" : "\n";
-    let resultLines = originalContent.split(/\r?\n/);
+    const resultLines = originalContent.split(/\r?\n/);
     
     for (const match of matches) {
       const searchContent = match[1].trim();
@@ -130,10 +133,8 @@ class SimpleDiffStrategy implements DiffStrategy {
         };
       }
 
-      // Apply the replacement
-      const beforeMatch = resultLines.slice(0, bestMatchIndex);
-      const afterMatch = resultLines.slice(bestMatchIndex + searchLines.length);
-      resultLines = [...beforeMatch, ...replaceLines, ...afterMatch];
+      // Apply the replacement in place rather than rebuilding the whole array
+      resultLines.splice(bestMatchIndex, searchLines.length, ...replaceLines);
     }
 
     return {
@@ -148,22 +149,20 @@ class SimpleDiffStrategy implements DiffStrategy {
  */
 export class DiffApplicator {
   private diffStrategy: DiffStrategy;
-  private robustStrategy: RobustDiffStrategy;
+  private robustStrategy: RobustDiffStrategy | undefined;
+  private fuzzyThreshold: number;
 
   constructor(
     fuzzyThreshold: number = 0.8, 
     useRobustStrategy: boolean = true
   ) {
-    this.diffStrategy = new SimpleDiffStrategy(fuzzyThreshold);
-    this.robustStrategy = new RobustDiffStrategy({ 
-      fuzzyThreshold, 
-      preserveIndentation: true 
-    });
-    
-    // Use robust strategy by default for better reliability
-    if (useRobustStrategy) {
-      this.diffStrategy = this.createRobustStrategyWrapper();
-    }
+    this.fuzzyThreshold = fuzzyThreshold;
+
+    // Use robust strategy by default for better reliability; only the
+    // selected strategy is constructed
+    this.diffStrategy = useRobustStrategy
+      ? this.createRobustStrategyWrapper()
+      : new SimpleDiffStrategy(fuzzyThreshold);
   }
 
   /**
@@ -181,10 +180,15 @@ export class DiffApplicator {
    * Create a wrapper to make RobustDiffStrategy compatible with DiffStrategy interface
    */
   private createRobustStrategyWrapper(): DiffStrategy {
+    const robustStrategy = (this.robustStrategy ??= new RobustDiffStrategy({
+      fuzzyThreshold: this.fuzzyThreshold,
+      preserveIndentation: true
+    }));
+
     return {
       getName: () => 'RobustDiffStrategy',
       applyDiff: async (originalContent: string, diffContent: string): Promise<DiffResult> => {
-        const result = await this.robustStrategy.applyDiff(originalContent, diffContent);
+        const result = await robustStrategy.applyDiff(originalContent, diffContent);
         
         if (result.success) {
           return {
@@ -211,14 +215,16 @@ export class DiffApplicator {
   }
 
   /**
-   * Apply a diff to a node JSON definition
+   * Apply a diff to a node JSON definition (or its pre-serialized JSON text)
    */
   async applyNodeDiff(
-    originalNode: JsonNodeDefinition, 
+    originalNode: JsonNodeDefinition | string, 
     diffContent: string
   ): Promise<{ success: boolean; node?: JsonNodeDefinition; error?: string }> {
     try {
-      const originalJSON = JSON.stringify(originalNode, null, 2);
+      const originalJSON = typeof originalNode === 'string'
+        ? originalNode
+        : JSON.stringify(originalNode, null, 2);
       const result = await this.diffStrategy.applyDiff(originalJSON, diffContent);
       
       if (!result.success) {
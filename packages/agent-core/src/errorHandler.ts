@@ -94,17 +94,16 @@ export function withErrorHandlingGenerator<T extends any[], R>(
   return async function* (...args: T): AsyncGenerator<string, StandardResponse<R>> {
     try {
       const generator = fn(...args);
-      let finalResult: R;
-      
-      for await (const chunk of generator) {
-        if (typeof chunk === 'string') {
-          yield chunk;
-        } else {
-          finalResult = chunk;
+
+      // Yields are always strings; the result only arrives as the return value,
+      // which for-await would discard, so step the generator by hand.
+      while (true) {
+        const step = await generator.next();
+        if (step.done) {
+          return createSuccessResponse(step.value);
         }
+        yield step.value;
       }
-      
-      return createSuccessResponse(finalResult!);
     } catch (error) {
       const standardError = handleError(error, context);
       yield `Error in ${context}: ${standardError.message}`;
@@ -142,6 +141,16 @@ export function handleError(error: any, context?: string): StandardError {
     );
   }
 
+  // Handle model calls cut off by their session timeout
+  if (error && error.name === 'TimeoutError') {
+    return createError(
+      ErrorType.NETWORK_ERROR,
+      'AI request timed out',
+      error,
+      context
+    );
+  }
+
   // Handle parsing errors
   if (error && (error instanceof SyntaxError || error.name === 'SyntaxError')) {
     return createError(
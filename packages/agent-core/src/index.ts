@@ -12,8 +12,9 @@ export type { JsonNodeDefinition } from './jsonNodes';
 // Prompt builders (static parts)
 export {
   buildNodeExamples, buildScenePresets, buildSceneExamples,
-  buildSceneGenerationGuidelines, buildPromptForTask,
+  buildSceneGenerationGuidelines, buildPromptForTask, buildPromptPartsForTask,
 } from './contextBuilders';
+export type { PromptParts } from './contextBuilders';
 
 // Validators
 export {
@@ -21,7 +22,9 @@ export {
 } from './validators';
 
 // AI client
-export { createStreamingSession, getAvailableModels, BASE_SYSTEM_PROMPT } from './aiClient';
+export {
+  createStreamingSession, getAvailableModels, BASE_SYSTEM_PROMPT, DEFAULT_SESSION_TIMEOUT_MS,
+} from './aiClient';
 
 // Error handling
 export {
@@ -31,6 +34,12 @@ export {
 } from './errorHandler';
 export type { StandardError, StandardResponse } from './errorHandler';
 
+// Model output parsing
+export { extractJsonObject, parseJsonResponse, JsonObjectScanner } from './jsonResponse';
+
+// SSE framing
+export { sseFrame, sseFrameWithJson, textFrame } from './sseFrames';
+
 // Diff
 export { DiffApplicator } from './diffApplicator';
 
@@ -0,0 +1,91 @@
+/**
+ * Helpers for pulling a JSON object out of raw model output.
+ * Models are told to answer with pure JSON but still wrap it in markdown
+ * fences or add a sentence before/after it now and then.
+ */
+
+// Opening (```json) and closing (```) fences, stripped in one pass
+const FENCE_RE = /```(?:json)?\s*/g;
+
+/** Strip markdown fences and trim to the outermost `{ ... }` span */
+export function extractJsonObject(response: string): string {
+  // Fast path: the model followed instructions and returned a bare object
+  const trimmed = response.trim();
+  if (trimmed.startsWith('{') && trimmed.endsWith('}')) {
+    return trimmed;
+  }
+
+  // Only run the regex when there is a fence to strip
+  let cleaned = response.includes('```') ? response.replace(FENCE_RE, '') : response;
+
+  const jsonStart = cleaned.indexOf('{');
+  const jsonEnd = cleaned.lastIndexOf('}');
+
+  if (jsonStart !== -1 && jsonEnd !== -1 && jsonEnd > jsonStart) {
+    cleaned = cleaned.substring(jsonStart, jsonEnd + 1);
+  }
+
+  return cleaned.trim();
+}
+
+/** Parse the JSON object embedded in a model response, or null if there is none */
+export function parseJsonResponse<T = any>(response: string): T | null {
+  const json = extractJsonObject(response);
+  if (!json.startsWith('{')) return null;
+  try {
+    return JSON.parse(json) as T;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Incremental brace matcher for streamed model output.
+ * Feed chunks as they arrive; `push` returns true once the first top-level
+ * object has closed, so callers can stop reading the stream right there
+ * instead of waiting for trailing prose or the provider's end of stream.
+ */
+export class JsonObjectScanner {
+  private depth = 0;
+  private inString = false;
+  private escaped = false;
+  private started = false;
+  done = false;
+
+  push(chunk: string): boolean {
+    if (this.done) return true;
+
+    // Until the object opens only a `{` matters, so skip any preamble in one
+    // indexOf instead of stepping through it character by character
+    let i = 0;
+    if (!this.started) {
+      i = chunk.indexOf('{');
+      if (i === -1) return false;
+    }
+
+    for (; i < chunk.length; i++) {
+      const ch = chunk.charCodeAt(i);
+
+      if (this.inString) {
+        if (this.escaped) this.escaped = false;
+        else if (ch === 92 /* \ */) this.escaped = true;
+        else if (ch === 34 /* " */) this.inString = false;
+        continue;
+      }
+
+      if (ch === 34 /* " */) {
+        if (this.started) this.inString = true;
+      } else if (ch === 123 /* { */) {
+        this.started = true;
+        this.depth++;
+      } else if (ch === 125 /* } */ && this.started) {
+        if (--this.depth === 0) {
+          this.done = true;
+          return true;
+        }
+      }
+    }
+
+    return false;
+  }
+}
@@ -78,12 +78,13 @@ export function applyOp(snapshot: EditorSnapshot, op: EditorOp): EditorSnapshot
       const { id, data, position, type } = op.payload;
       const nodes = snapshot.nodes.map(n => {
         if (n.id !== id) return n;
-        return {
-          ...n,
-          ...(type !== undefined ? { type } : {}),
-          ...(position !== undefined ? { position } : {}),
-          ...(data !== undefined ? { data: { ...n.data, ...data } } : {}),
-        };
+        // Assign the changed fields directly rather than spreading a
+        // throwaway object per optional field
+        const updated = { ...n };
+        if (type !== undefined) updated.type = type;
+        if (position !== undefined) updated.position = position;
+        if (data !== undefined) updated.data = { ...n.data, ...data };
+        return updated;
       });
       return { ...snapshot, nodes, version };
     }
@@ -3,6 +3,8 @@
  * Implements fuzzy matching, multi-hunk support, and granular error reporting
  */
 
+import { distance } from 'fastest-levenshtein';
+
 export interface DiffHunk {
   id: string;
   searchContent: string;
@@ -37,6 +39,9 @@ export interface FuzzyMatch {
   similarity: number;
 }
 
+const LEADING_WHITESPACE_RE = /^(\s*)/;
+const STRIP_INDENT_RE = /^\s*/;
+
 export class RobustDiffStrategy {
   private fuzzyThreshold: number;
   private maxSearchWindow: number;
@@ -56,45 +61,31 @@ export class RobustDiffStrategy {
    * Apply multiple SEARCH/REPLACE blocks with fuzzy matching
    */
   async applyDiff(originalContent: string, diffContent: string): Promise<DiffResult> {
-    // First, validate the diff content syntax
-    const validationResult = this.validateMarkerSequencing(diffContent);
-    if (!validationResult.isValid) {
+    // Parse hunks from diff content, validating the marker syntax
+    const { hunks, error } = this.parseHunks(diffContent);
+    if (error) {
       return {
         success: false,
         failedParts: [{
           hunk: { id: 'validation', searchContent: '', replaceContent: '' },
-          reason: validationResult.error || 'Invalid diff format',
+          reason: error,
           suggestion: 'Use proper <<<<<<< SEARCH ... ======= ... >>>>>>> REPLACE format'
         }],
         appliedParts: []
       };
     }
 
-    // Parse hunks from diff content
-    const hunks = this.parseHunks(diffContent);
-    
-    if (hunks.length === 0) {
-      return {
-        success: false,
-        failedParts: [{
-          hunk: { id: 'parse', searchContent: '', replaceContent: '' },
-          reason: 'No valid diff hunks found',
-          suggestion: 'Ensure your diff contains <<<<<<< SEARCH ... ======= ... >>>>>>> REPLACE blocks'
-        }],
-        appliedParts: []
-      };
-    }
-
     // Apply hunks sequentially with line delta tracking
     let workingContent = originalContent;
     const contentLines = workingContent.split('\n');
     const failedParts: DiffFailure[] = [];
     const appliedParts: DiffSuccess[] = [];
     let lineOffset = 0; // Track line number changes
+    let cursor = 0; // Hunks arrive in file order; end of the last applied replacement
 
     for (const hunk of hunks) {
       try {
-        const result = this.applyHunk(contentLines, hunk, lineOffset);
+        const result = this.applyHunk(contentLines, hunk, lineOffset, cursor);
         
         if (result.success) {
           // Update working content
@@ -106,6 +97,7 @@ export class RobustDiffStrategy {
           
           // Update line offset for subsequent hunks
           lineOffset += result.replacementLines.length - (result.matchEnd - result.matchStart + 1);
+          cursor = result.matchStart + result.replacementLines.length;
           
           appliedParts.push({
             hunk,
@@ -139,111 +131,67 @@ export class RobustDiffStrategy {
   }
 
   /**
-   * Validate SEARCH/REPLACE marker sequencing
+   * Parse SEARCH/REPLACE hunks in a single pass over the diff, validating
+   * marker sequencing as it goes
    */
-  private validateMarkerSequencing(content: string): { isValid: boolean; error?: string } {
+  private parseHunks(content: string): { hunks: DiffHunk[]; error?: string } {
+    const hunks: DiffHunk[] = [];
     const lines = content.split('\n');
+    let searchLines: string[] = [];
+    let replaceLines: string[] = [];
     let state: 'start' | 'in_search' | 'in_replace' = 'start';
-    let blockCount = 0;
-    
+
     for (let i = 0; i < lines.length; i++) {
-      const line = lines[i].trim();
-      
-      if (line.startsWith('<<<<<<< SEARCH')) {
+      const line = lines[i];
+      const trimmed = line.trim();
+
+      if (trimmed.startsWith('<<<<<<< SEARCH')) {
         if (state !== 'start') {
-          return { 
-            isValid: false, 
-            error: `Unexpected SEARCH marker at line ${i + 1}. Found inside another block.` 
-          };
+          return { hunks, error: `Unexpected SEARCH marker at line ${i + 1}. Found inside another block.` };
         }
+        searchLines = [];
+        replaceLines = [];
         state = 'in_search';
-        blockCount++;
-      } else if (line === '=======') {
+      } else if (trimmed === '=======') {
         if (state !== 'in_search') {
-          return { 
-            isValid: false, 
-            error: `Unexpected separator at line ${i + 1}. Missing SEARCH marker.` 
-          };
+          return { hunks, error: `Unexpected separator at line ${i + 1}. Missing SEARCH marker.` };
         }
         state = 'in_replace';
-      } else if (line.startsWith('>>>>>>> REPLACE')) {
+      } else if (trimmed.startsWith('>>>>>>> REPLACE')) {
         if (state !== 'in_replace') {
-          return { 
-            isValid: false, 
-            error: `Unexpected REPLACE marker at line ${i + 1}. Missing separator.` 
-          };
+          return { hunks, error: `Unexpected REPLACE marker at line ${i + 1}. Missing separator.` };
         }
+        hunks.push({
+          id: `hunk-${hunks.length}`,
+          searchContent: searchLines.join('\n'),
+          replaceContent: replaceLines.join('\n'),
+        });
         state = 'start';
-      } else if (line.includes('<<<<<<<') || line.includes('>>>>>>>')) {
+      } else if (trimmed.includes('<<<<<<<') || trimmed.includes('>>>>>>>')) {
         // Check for unescaped conflict markers
-        return {
-          isValid: false,
-          error: `Unescaped conflict marker at line ${i + 1}. Use \\< or \\> to escape.`
-        };
+        return { hunks, error: `Unescaped conflict marker at line ${i + 1}. Use \\< or \\> to escape.` };
+      } else if (state === 'in_search') {
+        searchLines.push(line);
+      } else if (state === 'in_replace') {
+        replaceLines.push(line);
       }
     }
-    
+
     if (state !== 'start') {
-      return { 
-        isValid: false, 
-        error: `Incomplete diff block. Expected REPLACE marker to close the last block.` 
-      };
-    }
-    
-    if (blockCount === 0) {
-      return { 
-        isValid: false, 
-        error: `No SEARCH/REPLACE blocks found.` 
-      };
+      return { hunks, error: `Incomplete diff block. Expected REPLACE marker to close the last block.` };
     }
-    
-    return { isValid: true };
-  }
 
-  /**
-   * Parse SEARCH/REPLACE hunks from diff content
-   */
-  private parseHunks(content: string): DiffHunk[] {
-    const hunks: DiffHunk[] = [];
-    const lines = content.split('\n');
-    let currentHunk: Partial<DiffHunk> | null = null;
-    let searchLines: string[] = [];
-    let replaceLines: string[] = [];
-    let state: 'search' | 'replace' | 'none' = 'none';
-    
-    for (let i = 0; i < lines.length; i++) {
-      const line = lines[i];
-      
-      if (line.trim().startsWith('<<<<<<< SEARCH')) {
-        // Start new hunk
-        currentHunk = { id: `hunk-${hunks.length}` };
-        searchLines = [];
-        replaceLines = [];
-        state = 'search';
-      } else if (line.trim() === '=======') {
-        state = 'replace';
-      } else if (line.trim().startsWith('>>>>>>> REPLACE')) {
-        if (currentHunk) {
-          currentHunk.searchContent = searchLines.join('\n');
-          currentHunk.replaceContent = replaceLines.join('\n');
-          hunks.push(currentHunk as DiffHunk);
-        }
-        currentHunk = null;
-        state = 'none';
-      } else if (state === 'search') {
-        searchLines.push(line);
-      } else if (state === 'replace') {
-        replaceLines.push(line);
-      }
+    if (hunks.length === 0) {
+      return { hunks, error: `No SEARCH/REPLACE blocks found.` };
     }
-    
-    return hunks;
+
+    return { hunks };
   }
 
   /**
    * Apply a single hunk with fuzzy matching
    */
-  private applyHunk(contentLines: string[], hunk: DiffHunk, lineOffset: number): {
+  private applyHunk(contentLines: string[], hunk: DiffHunk, lineOffset: number, cursor: number): {
     success: boolean;
     matchStart: number;
     matchEnd: number;
@@ -257,7 +205,7 @@ export class RobustDiffStrategy {
     const replaceLines = hunk.replaceContent.split('\n');
     
     // Try exact match first
-    const exactMatch = this.findExactMatch(contentLines, searchLines, lineOffset);
+    const exactMatch = this.findExactMatch(contentLines, searchLines, cursor);
     if (exactMatch) {
       const indentedReplacement = this.preserveIndentation 
         ? this.applyIndentation(replaceLines, this.detectIndentation(contentLines, exactMatch.start))
@@ -309,26 +257,40 @@ export class RobustDiffStrategy {
   }
 
   /**
-   * Find exact string match
+   * Find exact string match, scanning forward from `from` first and only
+   * falling back to the lines before it when nothing matches after it
    */
-  private findExactMatch(contentLines: string[], searchLines: string[], lineOffset: number): { start: number; end: number } | null {
+  private findExactMatch(contentLines: string[], searchLines: string[], from: number): { start: number; end: number } | null {
     if (searchLines.length === 0) return null;
-    
-    for (let i = 0; i <= contentLines.length - searchLines.length; i++) {
+
+    return this.scanExactMatch(contentLines, searchLines, from, contentLines.length)
+      ?? (from > 0 ? this.scanExactMatch(contentLines, searchLines, 0, from) : null);
+  }
+
+  /**
+   * Find the first exact match starting in [from, until)
+   */
+  private scanExactMatch(contentLines: string[], searchLines: string[], from: number, until: number): { start: number; end: number } | null {
+    // Only lines equal to the first search line can start a match, so jump
+    // between those with indexOf instead of comparing at every offset.
+    const first = searchLines[0];
+    const lastStart = Math.min(contentLines.length - searchLines.length, until - 1);
+
+    for (let i = contentLines.indexOf(first, from); i !== -1 && i <= lastStart; i = contentLines.indexOf(first, i + 1)) {
       let matches = true;
-      
-      for (let j = 0; j < searchLines.length; j++) {
+
+      for (let j = 1; j < searchLines.length; j++) {
         if (contentLines[i + j] !== searchLines[j]) {
           matches = false;
           break;
         }
       }
-      
+
       if (matches) {
         return { start: i, end: i + searchLines.length - 1 };
       }
     }
-    
+
     return null;
   }
 
@@ -346,74 +308,48 @@ export class RobustDiffStrategy {
     const endSearch = Math.min(contentLines.length - searchLines.length, startSearch + searchWindow);
     
     for (let i = startSearch; i <= endSearch; i++) {
-      const candidateLines = contentLines.slice(i, i + searchLines.length);
-      const similarity = this.calculateSimilarity(searchLines, candidateLines);
+      const similarity = this.calculateSimilarity(searchLines, contentLines, i);
       
       if (!bestMatch || similarity > bestMatch.similarity) {
         bestMatch = {
-          lines: candidateLines,
+          lines: [],
           startIndex: i,
           endIndex: i + searchLines.length - 1,
           similarity
         };
       }
     }
+
+    // Only the winning window needs its own copy of the lines
+    if (bestMatch) {
+      bestMatch.lines = contentLines.slice(bestMatch.startIndex, bestMatch.endIndex + 1);
+    }
     
     return bestMatch;
   }
 
   /**
-   * Calculate similarity between two sets of lines using Levenshtein distance
+   * Calculate similarity between the search lines and the same number of
+   * content lines starting at `offset`, using Levenshtein distance
    */
-  private calculateSimilarity(lines1: string[], lines2: string[]): number {
-    if (lines1.length !== lines2.length) return 0;
+  private calculateSimilarity(searchLines: string[], contentLines: string[], offset: number): number {
+    if (offset < 0 || offset + searchLines.length > contentLines.length) return 0;
     
     let totalDistance = 0;
     let totalLength = 0;
     
-    for (let i = 0; i < lines1.length; i++) {
-      const distance = this.levenshteinDistance(lines1[i], lines2[i]);
-      const maxLength = Math.max(lines1[i].length, lines2[i].length);
+    for (let i = 0; i < searchLines.length; i++) {
+      const searchLine = searchLines[i];
+      const contentLine = contentLines[offset + i];
       
-      totalDistance += distance;
-      totalLength += maxLength;
+      totalDistance += distance(searchLine, contentLine);
+      totalLength += Math.max(searchLine.length, contentLine.length);
     }
     
     if (totalLength === 0) return 1; // Both empty
     return 1 - (totalDistance / totalLength);
   }
 
-  /**
-   * Calculate Levenshtein distance between two strings
-   */
-  private levenshteinDistance(str1: string, str2: string): number {
-    const matrix: number[][] = [];
-    
-    for (let i = 0; i <= str2.length; i++) {
-      matrix[i] = [i];
-    }
-    
-    for (let j = 0; j <= str1.length; j++) {
-      matrix[0][j] = j;
-    }
-    
-    for (let i = 1; i <= str2.length; i++) {
-      for (let j = 1; j <= str1.length; j++) {
-        if (str2.charAt(i - 1) === str1.charAt(j - 1)) {
-          matrix[i][j] = matrix[i - 1][j - 1];
-        } else {
-          matrix[i][j] = Math.min(
-            matrix[i - 1][j - 1] + 1, // substitution
-            matrix[i][j - 1] + 1,     // insertion
-            matrix[i - 1][j] + 1      // deletion
-          );
-        }
-      }
-    }
-    
-    return matrix[str2.length][str1.length];
-  }
-
   /**
    * Detect indentation pattern from matched lines
    */
@@ -421,7 +357,7 @@ export class RobustDiffStrategy {
     if (matchStart >= contentLines.length) return '';
     
     const line = contentLines[matchStart];
-    const match = line.match(/^(\s*)/);
+    const match = line.match(LEADING_WHITESPACE_RE);
     return match ? match[1] : '';
   }
 
@@ -435,13 +371,13 @@ export class RobustDiffStrategy {
     const firstNonEmptyLine = lines.find(line => line.trim().length > 0);
     if (!firstNonEmptyLine) return lines;
     
-    const existingIndentation = firstNonEmptyLine.match(/^(\s*)/)?.[1] || '';
+    const existingIndentation = firstNonEmptyLine.match(LEADING_WHITESPACE_RE)?.[1] || '';
     
     return lines.map(line => {
       if (line.trim().length === 0) return line; // Preserve empty lines
       
       // Remove existing indentation and apply base indentation
-      const withoutIndent = line.replace(/^\s*/, '');
+      const withoutIndent = line.replace(STRIP_INDENT_RE, '');
       return baseIndentation + withoutIndent;
     });
   }
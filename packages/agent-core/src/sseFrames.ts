@@ -0,0 +1,31 @@
+// One encoder for every stream; TextEncoder is stateless.
+const encoder = new TextEncoder();
+
+/** Encode one SSE `data:` frame */
+export function sseFrame(obj: unknown): Uint8Array {
+  return encoder.encode(`data: ${JSON.stringify(obj)}\n\n`);
+}
+
+// Frame heads for the per-token text frames, so only the text itself is
+// serialized for each one. Output matches sseFrame({ type, content }).
+const TEXT_FRAME_HEADS = {
+  progress: 'data: {"type":"progress","content":',
+  stream: 'data: {"type":"stream","content":',
+} as const;
+
+/** Encode a `{ type, content }` text frame */
+export function textFrame(type: keyof typeof TEXT_FRAME_HEADS, content: string): Uint8Array {
+  return encoder.encode(`${TEXT_FRAME_HEADS[type]}${JSON.stringify(content)}}\n\n`);
+}
+
+/**
+ * Encode a frame that carries an already-serialized JSON value under `key`.
+ * `json` must be compact (single-line) JSON; it is spliced in verbatim instead
+ * of being parsed and stringified again. Output matches
+ * sseFrame({ ...fields, [key]: JSON.parse(json) }).
+ */
+export function sseFrameWithJson(fields: Record<string, unknown>, key: string, json: string): Uint8Array {
+  const head = JSON.stringify(fields);
+  const open = head === '{}' ? '{' : `${head.slice(0, -1)},`;
+  return encoder.encode(`data: ${open}${JSON.stringify(key)}:${json}}\n\n`);
+}
@@ -1,5 +1,8 @@
 import { describe, it, expect } from 'vitest';
-import { buildPromptForTask } from '../src/contextBuilders';
+import {
+  buildPromptForTask, buildPromptPartsForTask, joinPromptParts,
+  buildSceneGenerationGuidelines, buildSceneExamples,
+} from '../src/contextBuilders';
 
 describe('buildPromptForTask', () => {
   it('injects the provided catalog into a generate_scene prompt', () => {
@@ -21,3 +24,99 @@ describe('buildPromptForTask', () => {
     expect(prompt).toContain('doubles a number');
   });
 });
+
+// Scene prompts as they were built before being split for prompt caching.
+// The split moves the per-request lines to the end and must not change the text.
+const legacyGenerateScenePrompt = (description: string, catalog: string) => `TASK: "generate_scene"
+SCENE_DESCRIPTION: "${description}"
+
+${buildSceneGenerationGuidelines()}
+
+COMPREHENSIVE NODE CATALOG:
+The following catalog contains ALL available nodes organized by category, with complete input/output information, usage patterns, and common parameter values. Use this as your primary reference for node selection and configuration.
+
+${catalog}
+
+SCENE_EXAMPLES:
+Here are working examples of properly structured scenes:
+
+${buildSceneExamples()}
+
+CRITICAL INSTRUCTIONS:
+1. Use ONLY nodes from the catalog above
+2. Follow the exact handle naming convention (geometry-out → geometry-in, etc.)
+3. Use the usagePatterns and commonParameters from the catalog for each node
+4. Every scene MUST end with an output node
+5. Apply materials using set-material nodes (geometry + material → set-material → output)
+6. Use the connectionPatterns as your guide for data flow
+
+RESPONSE FORMAT:
+Return ONLY a valid JSON object with the complete scene structure. No explanations, no markdown formatting, just the raw JSON. The response should contain "nodes" and "edges" arrays following the exact structure shown in the examples.`;
+
+const legacyModifyScenePrompt = (description: string, sceneData: unknown, catalog: string) => `TASK: "modify_scene"
+MODIFICATION_DESCRIPTION: "${description}"
+
+ORIGINAL_SCENE_JSON:
+${JSON.stringify(sceneData, null, 2)}
+
+COMPREHENSIVE NODE CATALOG:
+The following catalog contains ALL available nodes organized by category, with complete input/output information, usage patterns, and common parameter values. Use this as your primary reference for node selection and configuration.
+
+${catalog}
+
+SCENE_GENERATION_GUIDELINES:
+${buildSceneGenerationGuidelines()}
+
+MODIFICATION_INSTRUCTIONS:
+Analyze the original scene and the modification description, then generate a complete modified scene JSON that incorporates the requested changes.
+
+MODIFICATION RULES:
+1. Start with the original scene structure
+2. Apply the requested modifications while preserving what should remain unchanged
+3. Maintain proper scene structure (nodes and edges arrays)
+4. Use only nodes from the catalog above
+5. Follow proper handle naming conventions for new connections
+6. Ensure all edges reference valid node IDs and handles
+7. Generate new unique IDs for any new nodes you add
+8. Preserve existing node IDs unless they need to be removed
+9. Update positions appropriately for new nodes
+
+CRITICAL INSTRUCTIONS:
+1. Use ONLY nodes from the catalog above
+2. Follow the exact handle naming convention (geometry-out → geometry-in, etc.)
+3. Use the usagePatterns and commonParameters from the catalog for each node
+4. Every scene MUST end with an output node
+5. Apply materials using set-material nodes (geometry + material → set-material → output)
+6. Use the connectionPatterns as your guide for data flow
+
+RESPONSE FORMAT:
+Return ONLY a valid JSON object with the complete modified scene structure. No explanations, no markdown formatting, just the raw JSON. The response should contain "nodes" and "edges" arrays following the exact structure of the original scene.`;
+
+describe('buildPromptPartsForTask', () => {
+  const catalog = 'CATALOG_SENTINEL_12345';
+
+  it('splits generate_scene without changing its text', () => {
+    const parts = buildPromptPartsForTask(
+      { task: 'generate_scene', scene_description: 'a red cube' },
+      catalog,
+    );
+    const request = 'SCENE_DESCRIPTION: "a red cube"';
+    const legacy = legacyGenerateScenePrompt('a red cube', catalog);
+
+    expect(parts.suffix).toBe(request);
+    expect(joinPromptParts(parts)).toBe(`${legacy.replace(`${request}\n`, '')}\n\n${request}`);
+  });
+
+  it('splits modify_scene without changing its text', () => {
+    const sceneData = { nodes: [{ id: 'n1', type: 'cube' }], edges: [] };
+    const parts = buildPromptPartsForTask(
+      { task: 'modify_scene', modification_description: 'make it blue', sceneData },
+      catalog,
+    );
+    const request = `MODIFICATION_DESCRIPTION: "make it blue"\n\nORIGINAL_SCENE_JSON:\n${JSON.stringify(sceneData, null, 2)}`;
+    const legacy = legacyModifyScenePrompt('make it blue', sceneData, catalog);
+
+    expect(parts.suffix).toBe(request);
+    expect(joinPromptParts(parts)).toBe(`${legacy.replace(`${request}\n`, '')}\n\n${request}`);
+  });
+});
@@ -0,0 +1,40 @@
+import { describe, it, expect } from 'vitest';
+import { withErrorHandlingGenerator, createError, ErrorType } from '../src/errorHandler';
+
+/** Drain a generator, returning its yields and its return value */
+async function drain<R>(generator: AsyncGenerator<string, R>) {
+  const yields: string[] = [];
+  while (true) {
+    const step = await generator.next();
+    if (step.done) return { yields, result: step.value };
+    yields.push(step.value);
+  }
+}
+
+describe('withErrorHandlingGenerator', () => {
+  it('passes yields through in order and returns the result as data', async () => {
+    const wrapped = withErrorHandlingGenerator(async function* (name: string) {
+      yield 'planning';
+      yield `building ${name}`;
+      return { name };
+    }, 'test');
+
+    const { yields, result } = await drain(wrapped('scene'));
+
+    expect(yields).toEqual(['planning', 'building scene']);
+    expect(result).toEqual({ success: true, data: { name: 'scene' }, warnings: undefined });
+  });
+
+  it('turns a mid-stream throw into an error yield and an error response', async () => {
+    const wrapped = withErrorHandlingGenerator(async function* () {
+      yield 'planning';
+      throw createError(ErrorType.AI_SERVICE_ERROR, 'model went away');
+    }, 'test');
+
+    const { yields, result } = await drain(wrapped());
+
+    expect(yields).toEqual(['planning', 'Error in test: model went away']);
+    expect(result.success).toBe(false);
+    expect(result.error).toMatchObject({ type: ErrorType.AI_SERVICE_ERROR, message: 'model went away' });
+  });
+});
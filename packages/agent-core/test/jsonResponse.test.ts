@@ -0,0 +1,48 @@
+import { describe, it, expect } from 'vitest';
+import { extractJsonObject, parseJsonResponse, JsonObjectScanner } from '../src/jsonResponse';
+
+describe('JsonObjectScanner', () => {
+  it('ignores braces inside strings', () => {
+    const scanner = new JsonObjectScanner();
+    expect(scanner.push('{"code": "if (x) { return \'}\'; }", "nested": {')).toBe(false);
+    expect(scanner.push('"a": 1}')).toBe(false);
+    expect(scanner.push('}')).toBe(true);
+    expect(scanner.done).toBe(true);
+  });
+
+  it('keeps a backslash escape that is split across chunks', () => {
+    const scanner = new JsonObjectScanner();
+    // The first chunk ends on the backslash; the quote that opens the second
+    // chunk is escaped, so the `}` after it is still inside the string.
+    expect(scanner.push('{"text": "say \\')).toBe(false);
+    expect(scanner.push('"}')).toBe(false);
+    expect(scanner.push('"}')).toBe(true);
+  });
+
+  it('skips a quoted preamble before the first brace', () => {
+    const scanner = new JsonObjectScanner();
+    expect(scanner.push('Here is the "scene" you asked for: ')).toBe(false);
+    expect(scanner.push('{"nodes": [], "edges": []}')).toBe(true);
+  });
+});
+
+describe('extractJsonObject', () => {
+  it('strips a markdown fence around the object', () => {
+    expect(extractJsonObject('```json\n{"a": 1}\n```')).toBe('{"a": 1}');
+  });
+
+  it('returns a bare object untouched via the fast path', () => {
+    // A fence inside a string would be stripped by the slow path
+    expect(extractJsonObject('  {"code": "```"}\n')).toBe('{"code": "```"}');
+  });
+});
+
+describe('parseJsonResponse', () => {
+  it('parses a fenced response', () => {
+    expect(parseJsonResponse('Sure!\n```json\n{"nodes": [1]}\n```\nDone.')).toEqual({ nodes: [1] });
+  });
+
+  it('returns null when there is no object', () => {
+    expect(parseJsonResponse('I could not build that scene.')).toBeNull();
+  });
+});
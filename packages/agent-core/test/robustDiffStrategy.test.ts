@@ -0,0 +1,82 @@
+import { describe, it, expect } from 'vitest';
+import { RobustDiffStrategy } from '../src/robustDiffStrategy';
+
+const hunk = (search: string[], replace: string[]) =>
+  ['<<<<<<< SEARCH', ...search, '=======', ...replace, '>>>>>>> REPLACE'];
+
+const diff = (...lines: string[][]) => lines.flat().join('\n');
+
+async function failureReason(diffContent: string): Promise<string> {
+  const result = await new RobustDiffStrategy().applyDiff('a\nb', diffContent);
+  expect(result.success).toBe(false);
+  expect(result.failedParts).toHaveLength(1);
+  return result.failedParts[0].reason;
+}
+
+describe('RobustDiffStrategy marker validation', () => {
+  it('rejects a SEARCH marker inside another block', async () => {
+    expect(await failureReason(diff(['<<<<<<< SEARCH', 'a', '<<<<<<< SEARCH'])))
+      .toBe('Unexpected SEARCH marker at line 3. Found inside another block.');
+  });
+
+  it('rejects a separator without a SEARCH marker', async () => {
+    expect(await failureReason(diff(['a', '=======', 'b'])))
+      .toBe('Unexpected separator at line 2. Missing SEARCH marker.');
+  });
+
+  it('rejects a REPLACE marker without a separator', async () => {
+    expect(await failureReason(diff(['<<<<<<< SEARCH', 'a', '>>>>>>> REPLACE'])))
+      .toBe('Unexpected REPLACE marker at line 3. Missing separator.');
+  });
+
+  it('rejects an unescaped conflict marker', async () => {
+    expect(await failureReason(diff(['<<<<<<< HEAD'])))
+      .toBe('Unescaped conflict marker at line 1. Use \\< or \\> to escape.');
+  });
+
+  it('rejects a block that is never closed', async () => {
+    expect(await failureReason(diff(['<<<<<<< SEARCH', 'a', '=======', 'b'])))
+      .toBe('Incomplete diff block. Expected REPLACE marker to close the last block.');
+  });
+
+  it('rejects a diff with no blocks', async () => {
+    expect(await failureReason('just some prose'))
+      .toBe('No SEARCH/REPLACE blocks found.');
+  });
+});
+
+describe('RobustDiffStrategy.applyDiff', () => {
+  it('applies several hunks in file order', async () => {
+    const original = ['{', '"name": "Cube",', '"size": 1,', '"color": "red"', '}'].join('\n');
+    const result = await new RobustDiffStrategy().applyDiff(original, diff(
+      hunk(['"name": "Cube",'], ['"name": "Box",']),
+      hunk(['"color": "red"'], ['"color": "blue"']),
+    ));
+
+    expect(result.success).toBe(true);
+    expect(result.appliedParts).toHaveLength(2);
+    expect(result.content).toBe(['{', '"name": "Box",', '"size": 1,', '"color": "blue"', '}'].join('\n'));
+  });
+
+  it('patches the occurrence after the previous hunk when the text repeats', async () => {
+    const original = ['a', 'x', 'b', 'x', 'c'].join('\n');
+    const result = await new RobustDiffStrategy().applyDiff(original, diff(
+      hunk(['b'], ['B']),
+      hunk(['x'], ['X']),
+    ));
+
+    expect(result.success).toBe(true);
+    expect(result.content).toBe(['a', 'x', 'B', 'X', 'c'].join('\n'));
+  });
+
+  it('falls back to text before the previous hunk when nothing matches after it', async () => {
+    const original = ['a', 'x', 'b', 'c'].join('\n');
+    const result = await new RobustDiffStrategy().applyDiff(original, diff(
+      hunk(['b'], ['B']),
+      hunk(['x'], ['X']),
+    ));
+
+    expect(result.success).toBe(true);
+    expect(result.content).toBe(['a', 'X', 'B', 'c'].join('\n'));
+  });
+});
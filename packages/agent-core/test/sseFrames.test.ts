@@ -0,0 +1,37 @@
+import { describe, it, expect } from 'vitest';
+import { sseFrame, sseFrameWithJson, textFrame } from '../src/sseFrames';
+
+const decoder = new TextDecoder();
+const text = (frame: Uint8Array) => decoder.decode(frame);
+
+// Quotes, backslashes, newlines, a non-BMP character and a line separator
+const tricky = 'say "hi"\\n\nline two 🎲 héllo \u2028 end';
+
+describe('textFrame', () => {
+  it.each(['progress', 'stream'] as const)('matches sseFrame for %s frames', (type) => {
+    for (const content of [tricky, '', '}{"type":"x"}']) {
+      expect(text(textFrame(type, content))).toBe(text(sseFrame({ type, content })));
+    }
+  });
+});
+
+describe('sseFrameWithJson', () => {
+  it('matches sseFrame of the parsed value', () => {
+    const value = { id: 'n1', label: tricky, nested: { list: [1, tricky] } };
+    const fields = { type: 'success', content: `Scene "${tricky}" modified` };
+
+    expect(text(sseFrameWithJson(fields, 'scene', JSON.stringify(value))))
+      .toBe(text(sseFrame({ ...fields, scene: value })));
+  });
+
+  it('escapes the key', () => {
+    const key = `we"ird\n${tricky}`;
+    expect(text(sseFrameWithJson({ type: 'success' }, key, '[1,2]')))
+      .toBe(text(sseFrame({ type: 'success', [key]: [1, 2] })));
+  });
+
+  it('handles empty fields', () => {
+    expect(text(sseFrameWithJson({}, 'node', '{"a":1}')))
+      .toBe(text(sseFrame({ node: { a: 1 } })));
+  });
+});